@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Restaurant, Table
+from .models import Restaurant, Table, ArchivedOrder
 
 admin.site.register(Restaurant)
 admin.site.register(Table)
+admin.site.register(ArchivedOrder)
@@ -0,0 +1,291 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import F, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from ..models import (
+    DailySales,
+    DailyDishSales,
+    MenuItem,
+    Order,
+    OrderItem,
+    ArchivedOrder,
+    OrderStatusEvent,
+)
+
+DEFAULT_REPORT_DAYS = 30
+MAX_REPORT_DAYS = 366
+TOP_DISHES = 10
+
+
+def _increment(model, unique_fields, rows, increment_fields, replace_fields=()):
+    """
+    Inserts `rows` or adds their `increment_fields` onto the existing
+    counters, in one INSERT ... ON CONFLICT statement (SQLite and Postgres).
+    """
+    if not rows:
+        return
+
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns = list(rows[0])
+    column_names = [model._meta.get_field(c).column for c in columns]
+    unique_columns = [model._meta.get_field(c).column for c in unique_fields]
+
+    updates = [
+        f"{qn(c)} = {table}.{qn(c)} + excluded.{qn(c)}"
+        for c in (model._meta.get_field(f).column for f in increment_fields)
+    ] + [
+        f"{qn(c)} = excluded.{qn(c)}"
+        for c in (model._meta.get_field(f).column for f in replace_fields)
+    ]
+
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    sql = (
+        f"INSERT INTO {table} ({', '.join(qn(c) for c in column_names)}) "
+        f"VALUES {', '.join([placeholders] * len(rows))} "
+        f"ON CONFLICT ({', '.join(qn(c) for c in unique_columns)}) "
+        f"DO UPDATE SET {', '.join(updates)}"
+    )
+    params = [row[c] for row in rows for c in columns]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def record_order(order, order_items):
+    """
+    Adds a freshly placed order to its day's counters. Call inside the
+    transaction that creates the order so the counters never drift.
+    """
+    day = timezone.localdate(order.created_at)
+
+    _increment(
+        DailySales,
+        ["restaurant", "date"],
+        [{
+            "restaurant": order.restaurant_id,
+            "date": day,
+            "orders": 1,
+            "revenue": order.total,
+            "served": 0,
+            "ticket_seconds": 0,
+        }],
+        ["orders", "revenue"],
+    )
+    _increment(
+        DailyDishSales,
+        ["restaurant", "date", "item"],
+        [
+            {
+                "restaurant": order.restaurant_id,
+                "date": day,
+                "item": oi.item_id,
+                "name": oi.item.name,
+                "quantity": oi.quantity,
+                "revenue": oi.unit_price * oi.quantity,
+            }
+            for oi in order_items
+        ],
+        ["quantity", "revenue"],
+        replace_fields=["name"],
+    )
+
+
+def record_served(order):
+    """
+    Counts an order first reaching "served" against the day it was placed.
+    Call once per order, with updated_at set to the time it was served.
+    """
+    _increment(
+        DailySales,
+        ["restaurant", "date"],
+        [{
+            "restaurant": order.restaurant_id,
+            "date": timezone.localdate(order.created_at),
+            "orders": 0,
+            "revenue": Decimal("0"),
+            "served": 1,
+            "ticket_seconds": (order.updated_at - order.created_at).total_seconds(),
+        }],
+        ["served", "ticket_seconds"],
+    )
+
+
+def sales_report(restaurant, days=DEFAULT_REPORT_DAYS):
+    """
+    Revenue per day, top dishes and average ticket time for the last `days`
+    days. Reads only the daily counters, so the cost depends on `days` and
+    the menu size, not on how many orders the restaurant has taken.
+    """
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+
+    rows = {
+        row.date: row
+        for row in DailySales.objects.filter(
+            restaurant=restaurant,
+            date__gte=start
+        )
+    }
+
+    series = []
+    totals = {"orders": 0, "revenue": Decimal("0"), "served": 0, "ticket_seconds": 0.0}
+
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = rows.get(day)
+        orders = row.orders if row else 0
+        revenue = row.revenue if row else Decimal("0")
+        served = row.served if row else 0
+        ticket_seconds = row.ticket_seconds if row else 0.0
+
+        series.append({
+            "date": day,
+            "orders": orders,
+            "revenue": revenue,
+            "avg_ticket_seconds": ticket_seconds / served if served else None,
+        })
+        totals["orders"] += orders
+        totals["revenue"] += revenue
+        totals["served"] += served
+        totals["ticket_seconds"] += ticket_seconds
+
+    top_dishes = list(
+        DailyDishSales.objects.filter(
+            restaurant=restaurant,
+            date__gte=start
+        )
+        .values("item_id", "name")
+        .annotate(quantity=Sum("quantity"), revenue=Sum("revenue"))
+        .order_by("-quantity", "name")[:TOP_DISHES]
+    )
+
+    return {
+        "from": start,
+        "to": today,
+        "orders": totals["orders"],
+        "revenue": totals["revenue"],
+        "avg_ticket_seconds": (
+            totals["ticket_seconds"] / totals["served"] if totals["served"] else None
+        ),
+        "days": series,
+        "top_dishes": top_dishes,
+    }
+
+
+def rebuild_sales(restaurant_ids=None) -> int:
+    """
+    Recomputes the counters from live and archived orders, replacing what is
+    stored. Returns how many daily rows were written.
+    """
+    orders = Order.objects.all()
+    lines = OrderItem.objects.all()
+    archived = ArchivedOrder.objects.all()
+    served_events = OrderStatusEvent.objects.filter(to_status="served")
+
+    if restaurant_ids is not None:
+        orders = orders.filter(restaurant_id__in=restaurant_ids)
+        lines = lines.filter(order__restaurant_id__in=restaurant_ids)
+        archived = archived.filter(restaurant_id__in=restaurant_ids)
+        served_events = served_events.filter(restaurant_id__in=restaurant_ids)
+
+    # Like record_served, an order counts as served once, at the first time
+    # it got there; orders from before the status log use updated_at.
+    first_served = dict(
+        served_events.values("order_id")
+        .annotate(first=Min("created_at"))
+        .values_list("order_id", "first")
+    )
+
+    daily = defaultdict(lambda: {
+        "orders": 0, "revenue": Decimal("0"), "served": 0, "ticket_seconds": 0.0,
+    })
+    # Keyed by (restaurant, day, item, deleted dish); the last part tells
+    # apart archived lines whose dishes no longer exist.
+    dishes = defaultdict(lambda: {"name": "", "quantity": 0, "revenue": Decimal("0")})
+
+    def add_order(order_id, restaurant_id, order_status, total, created_at, updated_at):
+        counters = daily[restaurant_id, timezone.localdate(created_at)]
+        counters["orders"] += 1
+        counters["revenue"] += total
+
+        served_at = first_served.get(order_id)
+        if served_at is None and order_status == "served":
+            served_at = updated_at
+        if served_at is not None:
+            counters["served"] += 1
+            counters["ticket_seconds"] += (served_at - created_at).total_seconds()
+
+    for row in orders.values_list(
+        "id", "restaurant_id", "status", "total", "created_at", "updated_at"
+    ).iterator():
+        add_order(*row)
+
+    for row in (
+        lines.values(
+            "order__restaurant_id",
+            "item_id",
+            "item__name",
+            day=TruncDate("order__created_at"),
+        )
+        .annotate(units=Sum("quantity"), sales=Sum(F("unit_price") * F("quantity")))
+    ):
+        counters = dishes[row["order__restaurant_id"], row["day"], row["item_id"], None]
+        counters["name"] = row["item__name"]
+        counters["quantity"] += row["units"]
+        counters["revenue"] += Decimal(row["sales"])
+
+    # Archived lines keep the ids of dishes that may since have been deleted.
+    existing_items = set(MenuItem.objects.values_list("id", flat=True))
+
+    for order in archived.iterator():
+        add_order(
+            order.order_id,
+            order.restaurant_id,
+            order.status,
+            order.total,
+            order.created_at,
+            order.updated_at,
+        )
+        day = timezone.localdate(order.created_at)
+
+        for line in order.items:
+            if line["item_id"] in existing_items:
+                key = (order.restaurant_id, day, line["item_id"], None)
+            else:
+                key = (order.restaurant_id, day, None, line["item_id"] or line["name"])
+            counters = dishes[key]
+            counters["name"] = counters["name"] or line["name"]
+            counters["quantity"] += line["quantity"]
+            counters["revenue"] += Decimal(line["unit_price"]) * line["quantity"]
+
+    with transaction.atomic():
+        stored_daily = DailySales.objects.all()
+        stored_dishes = DailyDishSales.objects.all()
+
+        if restaurant_ids is not None:
+            stored_daily = stored_daily.filter(restaurant_id__in=restaurant_ids)
+            stored_dishes = stored_dishes.filter(restaurant_id__in=restaurant_ids)
+
+        stored_daily.delete()
+        stored_dishes.delete()
+
+        DailySales.objects.bulk_create(
+            [
+                DailySales(restaurant_id=restaurant_id, date=day, **counters)
+                for (restaurant_id, day), counters in daily.items()
+            ],
+            batch_size=500,
+        )
+        DailyDishSales.objects.bulk_create(
+            [
+                DailyDishSales(restaurant_id=restaurant_id, date=day, item_id=item_id, **counters)
+                for (restaurant_id, day, item_id, _), counters in dishes.items()
+            ],
+            batch_size=500,
+        )
+
+    return len(daily)
@@ -1,5 +1,16 @@
+import threading
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class RestaurantAppConfig(AppConfig):
     name = 'restaurant_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if getattr(settings, "OCR_PRELOAD", False):
+            from .ocr.registry import registry
+            # Load in the background so worker boot isn't held up; the first
+            # upload simply waits on the registry lock if it arrives early.
+            threading.Thread(target=registry.warm_up, daemon=True).start()
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+
+class Subscription:
+    """
+    One open dashboard stream. Events are handed over to the subscriber's
+    event loop; if the client falls too far behind the oldest event is
+    dropped and the stream tells the client to resync.
+    """
+
+    def __init__(self, restaurant_id: int, max_queue: int):
+        self.restaurant_id = restaurant_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = False
+
+    def deliver(self, event: dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped = True
+        self.queue.put_nowait(event)
+
+
+class OrderBroker:
+    """
+    In-process pub/sub for order events, keyed by restaurant.
+
+    Publishing is safe from any thread (sync views run in a worker thread
+    under ASGI). Subscribers only see events published in the same process,
+    so live updates need a single ASGI worker process.
+    """
+
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, restaurant_id: int) -> Subscription:
+        subscription = Subscription(restaurant_id, self.max_queue)
+        with self._lock:
+            self._subscribers[restaurant_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.restaurant_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.restaurant_id]
+
+    def has_subscribers(self, restaurant_id: int) -> bool:
+        with self._lock:
+            return bool(self._subscribers.get(restaurant_id))
+
+    def publish(self, restaurant_id: int, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(restaurant_id, ()))
+
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Event loop already closed; the stream is gone.
+                self.unsubscribe(subscription)
+
+
+broker = OrderBroker()
@@ -0,0 +1,40 @@
+import json
+import asyncio
+from django.core.serializers.json import DjangoJSONEncoder
+from .broker import broker
+
+HEARTBEAT_SECONDS = 15
+
+
+def format_event(event: dict) -> str:
+    data = json.dumps(event, cls=DjangoJSONEncoder)
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
+async def order_events(restaurant_id: int):
+    """
+    Server-sent event stream of order events for one restaurant.
+    """
+    subscription = broker.subscribe(restaurant_id)
+
+    try:
+        yield "retry: 3000\n\n"
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream.
+                yield ": keep-alive\n\n"
+                continue
+
+            if subscription.dropped:
+                subscription.dropped = False
+                yield format_event({"type": "resync"})
+
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,39 @@
+import threading
+
+
+class OrderWatcher:
+    """
+    Lets a request block until an order changes.
+
+    Only requests waiting on an order hold an entry, so memory stays
+    proportional to open long-polls. Notifications are in-process; callers
+    should still re-check the database periodically when running several
+    worker processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = {}
+
+    def wait(self, order_id: int, timeout: float) -> bool:
+        with self._lock:
+            entry = self._waiters.setdefault(order_id, [threading.Event(), 0])
+            entry[1] += 1
+
+        try:
+            return entry[0].wait(timeout)
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0 and self._waiters.get(order_id) is entry:
+                    del self._waiters[order_id]
+
+    def notify(self, order_id: int):
+        with self._lock:
+            entry = self._waiters.pop(order_id, None)
+
+        if entry:
+            entry[0].set()
+
+
+order_watcher = OrderWatcher()
@@ -0,0 +1,102 @@
+import os
+import threading
+
+
+def write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write then rename so a concurrent reader never sees half a file.
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class FileCache:
+    """
+    A directory of cache files kept under a byte budget.
+
+    Subclasses provide `directory` and `max_bytes`. Reads bump the file's
+    mtime, and once the directory grows past max_bytes the least recently
+    used files are deleted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sizes = None
+        self._scanned = None
+        self._total = 0
+
+    @property
+    def directory(self) -> str:
+        raise NotImplementedError
+
+    @property
+    def max_bytes(self) -> int:
+        raise NotImplementedError
+
+    def read(self, path: str):
+        """
+        The file's bytes, or None if it is not cached.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def write(self, path: str, data: bytes):
+        write_atomic(path, data)
+
+        with self._lock:
+            sizes = self._load_sizes()
+            self._total += len(data) - sizes.get(path, 0)
+            sizes[path] = len(data)
+
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def usage(self):
+        """
+        (entries, bytes) currently on disk.
+        """
+        with self._lock:
+            sizes = self._load_sizes()
+            return len(sizes), self._total
+
+    def _load_sizes(self) -> dict:
+        # Scanned once per process (and directory); afterwards write() keeps
+        # the sizes current.
+        if self._sizes is None or self._scanned != self.directory:
+            self._scanned = self.directory
+            self._sizes = {}
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if not name.endswith(".tmp"):
+                        path = os.path.join(root, name)
+                        self._sizes[path] = os.path.getsize(path)
+            self._total = sum(self._sizes.values())
+        return self._sizes
+
+    def _evict(self):
+        # Drop the oldest entries until the cache is back to 90% of its
+        # budget, so a full cache does not evict on every write.
+        target = self.max_bytes * 0.9
+        by_age = sorted(self._sizes, key=lambda p: _mtime(p))
+
+        for path in by_age:
+            if self._total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self._total -= self._sizes.pop(path)
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from restaurant_app.orders.archive import ARCHIVE_BATCH_SIZE, archive_served_orders
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves served orders older than --hours into the compact archive table. "
+        "Safe to run repeatedly, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=float, default=24)
+        parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        archived = archive_served_orders(options["hours"], options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} orders"))
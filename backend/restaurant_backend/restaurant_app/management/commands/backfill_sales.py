@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from restaurant_app.analytics.sales import rebuild_sales
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the daily sales counters from live and archived orders. "
+        "Run once after deploying analytics, or to repair drifted counters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--restaurant",
+            type=int,
+            action="append",
+            dest="restaurants",
+            help="Only rebuild this restaurant (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        rows = rebuild_sales(options["restaurants"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} daily sales rows"))
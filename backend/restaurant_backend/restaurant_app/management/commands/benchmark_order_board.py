@@ -0,0 +1,108 @@
+import time
+import statistics
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from restaurant_app.models import Restaurant, Table, Order
+
+BATCH_SIZE = 20000
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a large order history, times the kitchen order-board query and "
+        "fails if its p95 latency exceeds the budget. Everything runs in one "
+        "transaction that is rolled back, so the database is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=1_000_000)
+        parser.add_argument("--restaurants", type=int, default=100)
+        parser.add_argument("--open-orders", type=int, default=40,
+                            help="Pending/preparing orders per restaurant.")
+        parser.add_argument("--runs", type=int, default=200)
+        parser.add_argument("--budget-ms", type=float, default=20.0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            restaurant = self.seed(options)
+            timings = self.measure(restaurant, options["runs"])
+            transaction.set_rollback(True)
+
+        p50 = statistics.median(timings)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+
+        self.stdout.write(
+            f"order board: p50={p50:.2f}ms p95={p95:.2f}ms "
+            f"max={max(timings):.2f}ms over {len(timings)} runs"
+        )
+
+        if p95 > options["budget_ms"]:
+            raise CommandError(
+                f"p95 {p95:.2f}ms exceeds the {options['budget_ms']}ms budget"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Within budget"))
+
+    def seed(self, options):
+        start = time.perf_counter()
+
+        owner = User.objects.create_user(
+            username="benchmark-order-board",
+            email="benchmark@example.com",
+            password=None,
+        )
+        restaurants = Restaurant.objects.bulk_create([
+            Restaurant(owner=owner, name=f"Benchmark {i}", address="-")
+            for i in range(options["restaurants"])
+        ])
+        tables = Table.objects.bulk_create([
+            Table(restaurant=r, table_number=1, qr_token=f"bench-{r.id}")
+            for r in restaurants
+        ])
+
+        open_statuses = ["pending", "preparing"]
+        open_per_restaurant = options["open_orders"]
+        served_total = max(
+            0, options["orders"] - open_per_restaurant * len(restaurants)
+        )
+
+        batch = []
+        for i in range(served_total):
+            table = tables[i % len(tables)]
+            batch.append(Order(restaurant_id=table.restaurant_id, table=table, status="served"))
+            if len(batch) == BATCH_SIZE:
+                Order.objects.bulk_create(batch)
+                batch = []
+
+        for table in tables:
+            for i in range(open_per_restaurant):
+                batch.append(Order(
+                    restaurant_id=table.restaurant_id,
+                    table=table,
+                    status=open_statuses[i % 2],
+                ))
+        Order.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+
+        self.stdout.write(
+            f"seeded {Order.objects.count()} orders across "
+            f"{len(restaurants)} restaurants in {time.perf_counter() - start:.1f}s"
+        )
+        return restaurants[len(restaurants) // 2]
+
+    def measure(self, restaurant, runs):
+        def board_query():
+            return Order.objects.filter(
+                restaurant=restaurant,
+                status__in=["pending", "preparing"]
+            ).prefetch_related("items__item", "table").order_by("-created_at")
+
+        self.stdout.write(board_query().explain())
+
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            list(board_query())
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return timings
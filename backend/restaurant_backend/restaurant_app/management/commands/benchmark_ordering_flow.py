@@ -0,0 +1,394 @@
+import json
+import time
+import uuid
+import random
+import statistics
+import threading
+import http.client
+from urllib.parse import urlsplit
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+from restaurant_app.models import Restaurant, Table, MenuCategory, MenuItem, Order, OrderItem
+from restaurant_app.orders.kitchen import percentile
+
+# Kitchens move each order one step per pass.
+NEXT_STATUS = {"pending": "preparing", "preparing": "ready", "ready": "served"}
+
+
+class HttpClient:
+    """
+    Keep-alive HTTP client for one simulated diner or kitchen.
+    """
+
+    def __init__(self, base_url, results):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        self.prefix = parts.path.rstrip("/")
+        self.results = results
+
+    def request(self, endpoint, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.connection.close()
+            self.results.record(endpoint, time.perf_counter() - started, type(e).__name__)
+            return None, None
+
+        error = None if response.status < 400 else f"HTTP {response.status}"
+        self.results.record(endpoint, time.perf_counter() - started, error)
+        return response.status, json.loads(data) if data and error is None else None
+
+    def close(self):
+        self.connection.close()
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint, seconds, error=None):
+        with self.lock:
+            if error:
+                errors = self.errors.setdefault(endpoint, {})
+                errors[error] = errors.get(error, 0) + 1
+            else:
+                self.latencies.setdefault(endpoint, []).append(seconds * 1000)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the customer loop (menu -> place order -> poll status) and "
+        "the kitchen loop (current orders -> advance status) against a running "
+        "server that uses the same database. Seeds its own restaurants and "
+        "deletes them afterwards. Prints JSON results; with --baseline, fails if "
+        "any endpoint's p95 regressed by more than --max-regression."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument("--restaurants", type=int, default=5)
+        parser.add_argument("--tables", type=int, default=20)
+        parser.add_argument("--categories", type=int, default=8)
+        parser.add_argument("--items", type=int, default=60, help="Menu items per restaurant")
+        parser.add_argument(
+            "--history",
+            type=int,
+            default=0,
+            help="Served orders to pre-seed per restaurant",
+        )
+        parser.add_argument("--diners", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+        parser.add_argument("--status-polls", type=int, default=2)
+        parser.add_argument("--kitchen-interval", type=float, default=0.5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the JSON results to this file")
+        parser.add_argument("--baseline", help="Earlier results file to compare against")
+        parser.add_argument("--max-regression", type=float, default=0.2)
+        parser.add_argument(
+            "--metrics-token",
+            default="",
+            help="The server's METRICS_TOKEN, if it sets one",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        owners, restaurants = self.seed(options, rng)
+
+        try:
+            self.warm_up(restaurants, options["url"])
+            before = self.scrape_queries(options["url"], options["metrics_token"])
+            results, elapsed, orders = self.run(restaurants, options)
+            after = self.scrape_queries(options["url"], options["metrics_token"])
+        finally:
+            for owner in owners:
+                owner.delete()
+
+        report = self.report(options, results, elapsed, orders, before, after)
+        output = json.dumps(report, indent=2)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output + "\n")
+        self.stdout.write(output)
+
+        if options["baseline"]:
+            self.compare(report, options["baseline"], options["max_regression"])
+
+    def seed(self, options, rng):
+        owners, restaurants = [], []
+
+        for n in range(options["restaurants"]):
+            owner = User.objects.create_user(
+                username=f"benchmark-{uuid.uuid4().hex[:8]}",
+                password=None,
+            )
+            restaurant = Restaurant.objects.create(
+                owner=owner,
+                name=f"Benchmark {n}",
+                address="-",
+                no_of_tables=options["tables"],
+            )
+            Table.objects.bulk_create([
+                Table(restaurant=restaurant, table_number=t, qr_token=uuid.uuid4().hex)
+                for t in range(1, options["tables"] + 1)
+            ])
+            categories = MenuCategory.objects.bulk_create([
+                MenuCategory(restaurant=restaurant, name=f"Category {c}")
+                for c in range(options["categories"])
+            ])
+            items = MenuItem.objects.bulk_create([
+                MenuItem(
+                    category=categories[i % len(categories)],
+                    name=f"Dish {i}",
+                    price=rng.randint(50, 500),
+                )
+                for i in range(options["items"])
+            ])
+            self.seed_history(restaurant, items, options["history"], rng)
+
+            owners.append(owner)
+            restaurants.append({
+                "id": restaurant.id,
+                "tables": options["tables"],
+                "token": str(RefreshToken.for_user(owner).access_token),
+            })
+
+        return owners, restaurants
+
+    def seed_history(self, restaurant, items, count, rng):
+        tables = list(restaurant.tables.all())
+        orders = Order.objects.bulk_create([
+            Order(restaurant=restaurant, table=rng.choice(tables), status="served")
+            for _ in range(count)
+        ], batch_size=1000)
+
+        lines = []
+        for order in orders:
+            dishes = rng.sample(items, min(len(items), 3))
+            lines += [
+                OrderItem(order=order, item=item, quantity=1, unit_price=item.price)
+                for item in dishes
+            ]
+            order.total = sum(item.price for item in dishes)
+
+        OrderItem.objects.bulk_create(lines, batch_size=1000)
+        Order.objects.bulk_update(orders, ["total"], batch_size=1000)
+
+    def warm_up(self, restaurants, base_url):
+        """
+        One diner and one kitchen request, so a server that rejects them
+        (e.g. a Host missing from ALLOWED_HOSTS) stops the run instead of
+        being measured as errors.
+        """
+        restaurant = restaurants[0]
+        client = HttpClient(base_url, Results())
+        try:
+            for path, headers in (
+                (f"/info/{restaurant['id']}/", None),
+                (
+                    f"/currentorders/{restaurant['id']}/",
+                    {"Authorization": f"Bearer {restaurant['token']}"},
+                ),
+            ):
+                code, _ = client.request("warm-up", "GET", path, headers=headers)
+
+                if code is None:
+                    raise CommandError(f"Could not reach {base_url}")
+                if code >= 400:
+                    hint = (
+                        " Is its host in the server's ALLOWED_HOSTS?" if code == 400 else
+                        " Does the server use the same database as this command?"
+                    )
+                    raise CommandError(f"GET {path} returned HTTP {code}.{hint}")
+        finally:
+            client.close()
+
+    def run(self, restaurants, options):
+        results = Results()
+        deadline = time.perf_counter() + options["duration"]
+        placed = []
+        threads = []
+
+        def diner(index):
+            rng = random.Random(options["seed"] * 1000 + index)
+            client = HttpClient(options["url"], results)
+            try:
+                while time.perf_counter() < deadline:
+                    restaurant = rng.choice(restaurants)
+                    _, menu = client.request("info", "GET", f"/info/{restaurant['id']}/")
+                    if not menu:
+                        continue
+
+                    dishes = [item["id"] for c in menu["menu"] for item in c["items"]]
+                    items = [
+                        {"item_id": item_id, "quantity": rng.randint(1, 3)}
+                        for item_id in rng.sample(dishes, min(len(dishes), rng.randint(1, 5)))
+                    ]
+                    table = rng.randint(1, restaurant["tables"])
+                    code, order = client.request(
+                        "placeorder", "POST",
+                        f"/placeorder/{restaurant['id']}/{table}/",
+                        body={"items": items},
+                    )
+                    if code != 201:
+                        continue
+                    placed.append(order["order_id"])
+
+                    for _ in range(options["status_polls"]):
+                        client.request("orders", "GET", f"/orders/{order['order_id']}/")
+            finally:
+                client.close()
+
+        def kitchen(restaurant):
+            client = HttpClient(options["url"], results)
+            headers = {"Authorization": f"Bearer {restaurant['token']}"}
+            # currentorders/ does not list ready orders, so remember them.
+            ready = set()
+            try:
+                while time.perf_counter() < deadline:
+                    _, board = client.request(
+                        "currentorders", "GET",
+                        f"/currentorders/{restaurant['id']}/",
+                        headers=headers,
+                    )
+                    steps = [(order_id, "served") for order_id in ready]
+                    ready.clear()
+
+                    for order in (board or {}).get("pending_orders", []):
+                        steps.append((order["order_id"], NEXT_STATUS[order["status"]]))
+
+                    for order_id, new_status in steps:
+                        code, _ = client.request(
+                            "updateorder", "PATCH",
+                            f"/updateorder/{order_id}/",
+                            body={"status": new_status},
+                            headers=headers,
+                        )
+                        if code == 200 and new_status == "ready":
+                            ready.add(order_id)
+
+                    time.sleep(options["kitchen_interval"])
+            finally:
+                client.close()
+
+        threads += [threading.Thread(target=diner, args=(i,)) for i in range(options["diners"])]
+        threads += [threading.Thread(target=kitchen, args=(r,)) for r in restaurants]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results, time.perf_counter() - started, len(placed)
+
+    def scrape_queries(self, base_url, token=""):
+        """
+        {route: (query total, request count)} from /metrics, or None when
+        the server does not have PROFILING enabled.
+        """
+        parts = urlsplit(base_url)
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+        try:
+            connection.request("GET", parts.path.rstrip("/") + "/metrics", headers=headers)
+            response = connection.getresponse()
+            body = response.read().decode()
+        except OSError:
+            return None
+        finally:
+            connection.close()
+
+        if response.status != 200:
+            return None
+
+        totals = {}
+        for line in body.splitlines():
+            for suffix, index in (("_sum", 0), ("_count", 1)):
+                prefix = f"restaurant_http_db_queries{suffix}{{"
+                if line.startswith(prefix):
+                    labels, value = line[len(prefix):].rsplit("} ", 1)
+                    route = labels.split('route="', 1)[1].split('"', 1)[0]
+                    entry = totals.setdefault(route, [0.0, 0.0])
+                    entry[index] += float(value)
+        return totals
+
+    def report(self, options, results, elapsed, orders, before, after):
+        routes = {
+            "info": "info/<int:restaurant_id>/",
+            "placeorder": "placeorder/<int:restaurant_id>/<int:table_id>/",
+            "orders": "orders/<int:order_id>/",
+            "currentorders": "currentorders/<int:restaurant_id>/",
+            "updateorder": "updateorder/<int:order_id>/",
+        }
+        endpoints = {}
+
+        for endpoint in routes:
+            latencies = results.latencies.get(endpoint, [])
+            errors = results.errors.get(endpoint, {})
+            stats = {
+                "requests": len(latencies),
+                "errors": errors,
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                "p50_ms": None,
+                "p95_ms": None,
+                "p99_ms": None,
+                "queries_per_request": None,
+            }
+
+            if latencies:
+                stats.update(
+                    p50_ms=round(statistics.median(latencies), 2),
+                    p95_ms=round(percentile(latencies, 95), 2),
+                    p99_ms=round(percentile(latencies, 99), 2),
+                )
+
+            if before is not None and after is not None:
+                queries, count = after.get(routes[endpoint], (0, 0))
+                queries_before, count_before = before.get(routes[endpoint], (0, 0))
+                if count > count_before:
+                    stats["queries_per_request"] = round(
+                        (queries - queries_before) / (count - count_before), 2
+                    )
+
+            endpoints[endpoint] = stats
+
+        return {
+            "config": {
+                key: options[key]
+                for key in (
+                    "url", "restaurants", "tables", "categories", "items", "history", "diners",
+                    "duration", "status_polls", "kitchen_interval", "seed",
+                )
+            },
+            "elapsed_seconds": round(elapsed, 2),
+            "orders_placed": orders,
+            "orders_per_second": round(orders / elapsed, 2),
+            "endpoints": endpoints,
+        }
+
+    def compare(self, report, baseline_path, max_regression):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+        regressions = []
+        for endpoint, stats in report["endpoints"].items():
+            previous = baseline.get("endpoints", {}).get(endpoint, {}).get("p95_ms")
+            if previous and stats["p95_ms"] and stats["p95_ms"] > previous * (1 + max_regression):
+                regressions.append(f"{endpoint}: p95 {previous}ms -> {stats['p95_ms']}ms")
+
+        if regressions:
+            raise CommandError("Regressions:\n" + "\n".join(regressions))
+
+        self.stderr.write(self.style.SUCCESS("No p95 regressions against baseline"))
@@ -0,0 +1,121 @@
+import time
+import uuid
+import statistics
+import threading
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError
+from rest_framework.test import APIRequestFactory
+from restaurant_app.models import Restaurant, Table, MenuCategory, MenuItem
+from restaurant_app.views import place_order
+
+
+class Command(BaseCommand):
+    help = (
+        "Places orders concurrently from many tables against the configured "
+        "database and fails if any of them errors (e.g. 'database is locked'). "
+        "The seeded restaurant is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tables", type=int, default=50)
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--orders-per-thread", type=int, default=25)
+        parser.add_argument("--items-per-order", type=int, default=5)
+
+    def handle(self, *args, **options):
+        owner, restaurant, items = self.seed(options["tables"])
+
+        try:
+            latencies, errors, elapsed = self.run(restaurant, items, options)
+        finally:
+            restaurant.delete()
+            owner.delete()
+
+        placed = len(latencies)
+        self.stdout.write(f"{placed} orders in {elapsed:.2f}s ({placed / elapsed:.1f}/s)")
+
+        if placed > 1:
+            self.stdout.write(
+                f"latency p50={statistics.median(latencies):.1f}ms "
+                f"p95={statistics.quantiles(latencies, n=20)[-1]:.1f}ms"
+            )
+
+        if errors:
+            for message, count in errors.items():
+                self.stderr.write(f"{count} x {message}")
+            raise CommandError(f"{sum(errors.values())} orders failed")
+
+        self.stdout.write(self.style.SUCCESS("No failed orders"))
+
+    def seed(self, table_count):
+        owner = User.objects.create_user(
+            username=f"loadtest-{uuid.uuid4().hex[:8]}",
+            password=None,
+        )
+        restaurant = Restaurant.objects.create(
+            owner=owner,
+            name="Load test",
+            address="-",
+            no_of_tables=table_count,
+        )
+        Table.objects.bulk_create([
+            Table(restaurant=restaurant, table_number=n, qr_token=uuid.uuid4().hex)
+            for n in range(1, table_count + 1)
+        ])
+        category = MenuCategory.objects.create(restaurant=restaurant, name="Mains")
+        items = MenuItem.objects.bulk_create([
+            MenuItem(category=category, name=f"Dish {i}", price=100 + i)
+            for i in range(20)
+        ])
+        return owner, restaurant, items
+
+    def run(self, restaurant, items, options):
+        factory = APIRequestFactory()
+        lock = threading.Lock()
+        latencies = []
+        errors = {}
+        start_barrier = threading.Barrier(options["threads"])
+
+        def diner(thread_index):
+            start_barrier.wait()
+            try:
+                for n in range(options["orders_per_thread"]):
+                    table_number = (thread_index * options["orders_per_thread"] + n) % options["tables"] + 1
+                    body = {"items": [
+                        {"item_id": item.id, "quantity": 1}
+                        for item in items[n % len(items):][:options["items_per_order"]]
+                    ]}
+                    request = factory.post("/placeorder/", body, format="json")
+
+                    started = time.perf_counter()
+                    try:
+                        response = place_order(
+                            request,
+                            restaurant_id=restaurant.id,
+                            table_id=table_number,
+                        )
+                        failure = None if response.status_code == 201 else f"HTTP {response.status_code}"
+                    except OperationalError as e:
+                        failure = str(e)
+                    took = (time.perf_counter() - started) * 1000
+
+                    with lock:
+                        if failure:
+                            errors[failure] = errors.get(failure, 0) + 1
+                        else:
+                            latencies.append(took)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=diner, args=(i,))
+            for i in range(options["threads"])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return latencies, errors, time.perf_counter() - started
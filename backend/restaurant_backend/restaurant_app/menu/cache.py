@@ -0,0 +1,93 @@
+import json
+import time
+from django.core.cache import cache
+from ..models import Restaurant, MenuCategory
+
+# Payloads are keyed by version, so old entries are never served again once
+# the version moves on; the timeout only bounds how long they linger.
+MENU_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(restaurant_id: int) -> str:
+    return f"menu:{restaurant_id}:version"
+
+
+def get_menu_version(restaurant_id: int) -> int:
+    key = _version_key(restaurant_id)
+    version = cache.get(key)
+
+    if version is None:
+        # Seed from the clock rather than 1 so a cold cache never reuses a
+        # version number a client may still hold an ETag for.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_menu_version(restaurant_id: int):
+    key = _version_key(restaurant_id)
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def menu_etag(restaurant_id: int, version: int) -> str:
+    return f'"menu-{restaurant_id}-{version}"'
+
+
+def build_menu(restaurant_id: int):
+    try:
+        restaurant = Restaurant.objects.get(id=restaurant_id)
+    except Restaurant.DoesNotExist:
+        return None
+
+    # Use 'items' because that's the related_name in MenuItem
+    categories = MenuCategory.objects.filter(restaurant=restaurant).prefetch_related('items')
+
+    menu = []
+    for category in categories:
+        menu.append({
+            "category": category.name,
+            "items": [
+                {
+                    "id": item.id,
+                    "name": item.name,
+                    "description": item.description,
+                    "price": float(item.price),
+                    "veg": item.is_veg,
+                    "available": item.is_available,
+                }
+                for item in category.items.all()
+            ]
+        })
+
+    return {
+        "restaurant": {
+            "name": restaurant.name,
+            "description": restaurant.description,
+            "address": restaurant.address,
+        },
+        "menu": menu,
+    }
+
+
+def get_menu_json(restaurant_id: int, version: int):
+    """
+    Returns the public menu as pre-serialized JSON bytes, or None if the
+    restaurant does not exist.
+    """
+    key = f"menu:{restaurant_id}:{version}"
+    data = cache.get(key)
+
+    if data is None:
+        menu = build_menu(restaurant_id)
+        if menu is None:
+            return None
+
+        data = json.dumps(menu).encode()
+        cache.set(key, data, MENU_CACHE_TIMEOUT)
+
+    return data
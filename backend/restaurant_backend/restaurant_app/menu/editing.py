@@ -0,0 +1,198 @@
+from django.db import transaction
+from ..models import MenuCategory, MenuItem
+from .cache import bump_menu_version
+from .importer import (
+    CATEGORY_NAME_LENGTH,
+    ITEM_NAME_LENGTH,
+    MAX_IMPORT_ITEMS,
+    PRICE_ERROR,
+    parse_bool,
+    parse_price,
+)
+
+PATCH_BATCH_SIZE = 500
+
+# Patch key -> (model field, parser)
+ITEM_FIELDS = {
+    "available": ("is_available", lambda v: _parse_flag(v)),
+    "veg": ("is_veg", lambda v: _parse_flag(v)),
+    "price": ("price", parse_price),
+    "name": ("name", lambda v: _parse_text(v, ITEM_NAME_LENGTH, required=True)),
+    "description": ("description", lambda v: _parse_text(v, None)),
+}
+CATEGORY_FIELDS = {
+    "order": ("order", lambda v: _parse_order(v)),
+    "name": ("name", lambda v: _parse_text(v, CATEGORY_NAME_LENGTH, required=True)),
+}
+
+
+class InvalidPatch(ValueError):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid menu changes")
+        self.errors = errors
+
+
+class PatchTargetMissing(LookupError):
+    """
+    A patch named an item or category that is not on this restaurant's menu.
+    """
+
+
+def _parse_flag(value):
+    flag = parse_bool(value, None)
+    if flag is None:
+        raise ValueError(value)
+    return flag
+
+
+def _parse_text(value, max_length, required=False):
+    if not isinstance(value, str):
+        raise ValueError(value)
+
+    value = value.strip()
+    if (required and not value) or (max_length and len(value) > max_length):
+        raise ValueError(value)
+    return value
+
+
+def _parse_order(value):
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(value)
+    return value
+
+
+def _clean(entries, fields, kind):
+    """
+    {id: {model field: value}} from a list of {"id", ...changes} entries.
+    """
+    if not isinstance(entries, list):
+        raise InvalidPatch([{kind: None, "error": f"{kind} must be a list"}])
+
+    cleaned = {}
+    errors = []
+
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get("id"), int):
+            errors.append({kind: None, "error": "Each change needs an integer id"})
+            continue
+
+        changes = cleaned.setdefault(entry["id"], {})
+
+        for key, value in entry.items():
+            if key == "id":
+                continue
+            if key not in fields:
+                errors.append({kind: entry["id"], "field": key, "error": "Unknown field"})
+                continue
+
+            field, parse = fields[key]
+            try:
+                changes[field] = parse(value)
+            except ValueError:
+                message = PRICE_ERROR if key == "price" else "Invalid value"
+                errors.append({kind: entry["id"], "field": key, "error": message})
+
+    if errors:
+        raise InvalidPatch(errors)
+
+    return {pk: changes for pk, changes in cleaned.items() if changes}
+
+
+def _apply(queryset, changes):
+    """
+    Writes only the fields whose values actually differ, in bulk. Returns
+    how many rows changed.
+    """
+    objects = queryset.in_bulk(list(changes))
+
+    if len(objects) != len(changes):
+        raise PatchTargetMissing(sorted(set(changes) - set(objects)))
+
+    dirty = []
+    fields = set()
+
+    for pk, values in changes.items():
+        obj = objects[pk]
+        changed = {f for f, v in values.items() if getattr(obj, f) != v}
+
+        if changed:
+            for f in changed:
+                setattr(obj, f, values[f])
+            dirty.append(obj)
+            fields |= changed
+
+    if dirty:
+        queryset.model.objects.bulk_update(dirty, sorted(fields), batch_size=PATCH_BATCH_SIZE)
+
+    return len(dirty)
+
+
+def _set_availability(restaurant, changes):
+    """
+    Fast path for availability-only patches (e.g. 86-ing a dish mid-service):
+    one UPDATE per target value, no reads.
+    """
+    updated = 0
+
+    for available in (True, False):
+        ids = [pk for pk, values in changes.items() if values["is_available"] is available]
+
+        if not ids:
+            continue
+
+        targets = MenuItem.objects.filter(
+            id__in=ids,
+            category__restaurant=restaurant
+        )
+        matched = targets.update(is_available=available)
+
+        if matched != len(ids):
+            # Only on failure: find which ids were not on the menu.
+            found = set(targets.values_list("id", flat=True))
+            raise PatchTargetMissing(sorted(set(ids) - found))
+
+        updated += matched
+
+    return updated
+
+
+def apply_menu_patch(restaurant, data):
+    """
+    Applies {"items": [{"id", "available"?, "price"?, "name"?,
+    "description"?, "veg"?}], "categories": [{"id", "order"?, "name"?}]}
+    in one transaction, then invalidates the cached public menu.
+
+    Raises InvalidPatch (nothing written) for malformed changes and
+    PatchTargetMissing (rolled back) for ids not on the restaurant's menu.
+    """
+    if not isinstance(data, dict):
+        raise InvalidPatch([{"error": "Expected an object"}])
+
+    items = _clean(data.get("items", []), ITEM_FIELDS, "item")
+    categories = _clean(data.get("categories", []), CATEGORY_FIELDS, "category")
+
+    if len(items) + len(categories) > MAX_IMPORT_ITEMS:
+        raise InvalidPatch([{"error": f"At most {MAX_IMPORT_ITEMS} changes per request"}])
+
+    with transaction.atomic():
+        if items and all(set(values) == {"is_available"} for values in items.values()):
+            items_updated = _set_availability(restaurant, items)
+        else:
+            items_updated = _apply(
+                MenuItem.objects.filter(category__restaurant=restaurant),
+                items,
+            ) if items else 0
+
+        categories_updated = _apply(
+            MenuCategory.objects.filter(restaurant=restaurant),
+            categories,
+        ) if categories else 0
+
+        # bulk_update and update() skip the signals that normally do this.
+        if items_updated or categories_updated:
+            transaction.on_commit(lambda: bump_menu_version(restaurant.id))
+
+    return {
+        "items_updated": items_updated,
+        "categories_updated": categories_updated,
+    }
@@ -0,0 +1,245 @@
+import io
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from ..models import MenuCategory, MenuItem
+from .cache import bump_menu_version
+
+MAX_IMPORT_ITEMS = 10000
+MAX_REPORTED_ERRORS = 50
+IMPORT_BATCH_SIZE = 500
+
+CATEGORY_NAME_LENGTH = MenuCategory._meta.get_field("name").max_length
+ITEM_NAME_LENGTH = MenuItem._meta.get_field("name").max_length
+MAX_PRICE = Decimal("999999.99")
+PRICE_ERROR = f"Price must be a number between 0 and {MAX_PRICE}"
+
+TRUE_VALUES = {"1", "true", "yes", "y", "veg"}
+FALSE_VALUES = {"0", "false", "no", "n", "non-veg", "nonveg", ""}
+
+
+class MenuImportError(ValueError):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid menu rows")
+        self.errors = errors
+
+
+def read_menu_file(upload):
+    """
+    Menu rows from an uploaded .csv or .json file.
+
+    CSV needs category, name and price columns; description, veg and
+    available are optional. JSON may be a flat list of rows or a
+    {"menu": [{"category", "dishes" | "items": [...]}]} document.
+    """
+    name = (upload.name or "").lower()
+
+    try:
+        text = upload.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise MenuImportError([{"row": None, "error": "File must be UTF-8"}])
+
+    if name.endswith(".csv"):
+        return list(csv.DictReader(io.StringIO(text)))
+
+    if name.endswith(".json"):
+        try:
+            return flatten_menu(json.loads(text))
+        except json.JSONDecodeError:
+            raise MenuImportError([{"row": None, "error": "Invalid JSON"}])
+
+    raise MenuImportError([{"row": None, "error": "Expected a .csv or .json file"}])
+
+
+def flatten_menu(data):
+    if isinstance(data, dict):
+        data = data.get("menu")
+
+    if not isinstance(data, list):
+        raise MenuImportError([{"row": None, "error": "Menu must be a list"}])
+
+    rows = []
+    for entry in data:
+        dishes = entry.get("dishes", entry.get("items")) if isinstance(entry, dict) else None
+
+        if isinstance(dishes, list):
+            rows += [
+                {**dish, "category": entry.get("category")} if isinstance(dish, dict) else dish
+                for dish in dishes
+            ]
+        else:
+            rows.append(entry)
+
+    return rows
+
+
+def parse_bool(value, default):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+
+    value = str(value).strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def parse_price(value) -> Decimal:
+    try:
+        price = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(value)
+
+    if not price.is_finite() or price < 0 or price > MAX_PRICE:
+        raise ValueError(value)
+
+    return price.quantize(Decimal("0.01"))
+
+
+def validate_menu(rows):
+    """
+    Checks every row in one pass and returns cleaned rows, or raises
+    MenuImportError listing (up to MAX_REPORTED_ERRORS) problems.
+    """
+    if not rows:
+        raise MenuImportError([{"row": None, "error": "Menu cannot be empty"}])
+
+    if len(rows) > MAX_IMPORT_ITEMS:
+        raise MenuImportError([
+            {"row": None, "error": f"Menu cannot have more than {MAX_IMPORT_ITEMS} items"}
+        ])
+
+    cleaned = []
+    errors = []
+
+    def error(index, field, message):
+        errors.append({"row": index + 1, "field": field, "error": message})
+
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            error(index, None, "Row must be an object")
+            continue
+
+        category = str(row.get("category") or "").strip()
+        name = str(row.get("name") or "").strip()
+        description = str(row.get("description") or "").strip()
+
+        if not category:
+            error(index, "category", "Missing category")
+        elif len(category) > CATEGORY_NAME_LENGTH:
+            error(index, "category", f"Longer than {CATEGORY_NAME_LENGTH} characters")
+
+        if not name:
+            error(index, "name", "Missing name")
+        elif len(name) > ITEM_NAME_LENGTH:
+            error(index, "name", f"Longer than {ITEM_NAME_LENGTH} characters")
+
+        try:
+            price = parse_price(row.get("price"))
+        except ValueError:
+            error(index, "price", PRICE_ERROR)
+            price = None
+
+        flags = {}
+        for field in ("veg", "available"):
+            try:
+                flags[field] = parse_bool(row.get(field), True)
+            except ValueError as e:
+                error(index, field, f"Not a yes/no value: {e}")
+
+        if errors:
+            continue
+
+        cleaned.append({
+            "category": category,
+            "name": name,
+            "description": description,
+            "price": price,
+            "is_veg": flags["veg"],
+            "is_available": flags["available"],
+        })
+
+    if errors:
+        raise MenuImportError(errors[:MAX_REPORTED_ERRORS])
+
+    return cleaned
+
+
+def import_menu(restaurant, rows):
+    """
+    Creates missing categories and items from validated rows. Items whose
+    category and name already exist are updated in place, so re-importing
+    a menu does not duplicate it. Returns counts of what was written.
+
+    Query count does not depend on the menu size beyond the bulk batches.
+    """
+    with transaction.atomic():
+        categories = {
+            c.name: c
+            for c in MenuCategory.objects.filter(restaurant=restaurant)
+        }
+        next_order = max((c.order for c in categories.values()), default=-1) + 1
+
+        new_categories = []
+        for row in rows:
+            if row["category"] not in categories:
+                category = MenuCategory(
+                    restaurant=restaurant,
+                    name=row["category"],
+                    order=next_order + len(new_categories),
+                )
+                categories[category.name] = category
+                new_categories.append(category)
+
+        MenuCategory.objects.bulk_create(new_categories)
+
+        existing = {
+            (item.category_id, item.name): item
+            for item in MenuItem.objects.filter(category__restaurant=restaurant)
+        } if len(new_categories) < len(categories) else {}
+
+        created = {}
+        updated = {}
+
+        for row in rows:
+            category = categories[row["category"]]
+            key = (category.id, row["name"])
+            item = existing.get(key) or created.get(key)
+
+            if item is None:
+                created[key] = MenuItem(
+                    category=category,
+                    name=row["name"],
+                    description=row["description"],
+                    price=row["price"],
+                    is_veg=row["is_veg"],
+                    is_available=row["is_available"],
+                )
+                continue
+
+            item.description = row["description"]
+            item.price = row["price"]
+            item.is_veg = row["is_veg"]
+            item.is_available = row["is_available"]
+            if item.pk:
+                updated[key] = item
+
+        MenuItem.objects.bulk_create(created.values(), batch_size=IMPORT_BATCH_SIZE)
+        MenuItem.objects.bulk_update(
+            updated.values(),
+            ["description", "price", "is_veg", "is_available"],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+
+        # bulk_create/bulk_update skip the signals that normally do this.
+        transaction.on_commit(lambda: bump_menu_version(restaurant.id))
+
+    return {
+        "categories_created": len(new_categories),
+        "items_created": len(created),
+        "items_updated": len(updated),
+    }
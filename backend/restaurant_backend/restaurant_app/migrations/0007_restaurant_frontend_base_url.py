@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0006_alter_order_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='frontend_base_url',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-18 13:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0009_order_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.PositiveIntegerField(unique=True)),
+                ('table_number', models.PositiveIntegerField(null=True)),
+                ('status', models.CharField(max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('items', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='restaurant_app.restaurant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['restaurant', 'created_at'], name='archived_order_history_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.9 on 2026-10-18 14:05
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def snapshot_prices(apps, schema_editor):
+    MenuItem = apps.get_model('restaurant_app', 'MenuItem')
+    Order = apps.get_model('restaurant_app', 'Order')
+    OrderItem = apps.get_model('restaurant_app', 'OrderItem')
+
+    # Existing lines can only be priced at today's menu price.
+    OrderItem.objects.update(unit_price=Subquery(
+        MenuItem.objects.filter(id=OuterRef('item_id')).values('price')[:1]
+    ))
+
+    line_totals = OrderItem.objects.filter(
+        order_id=OuterRef('pk')
+    ).values('order_id').annotate(
+        total=Sum(F('unit_price') * F('quantity'))
+    ).values('total')
+
+    Order.objects.update(total=Coalesce(
+        Subquery(line_totals),
+        Value(0),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0010_archivedorder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+            preserve_default=False,
+        ),
+        migrations.RunPython(snapshot_prices, migrations.RunPython.noop),
+    ]
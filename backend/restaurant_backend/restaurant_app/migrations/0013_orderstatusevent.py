@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-18 13:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0012_sales_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.PositiveIntegerField()),
+                ('from_status', models.CharField(max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('placed_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField()),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_status_events', to='restaurant_app.restaurant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['restaurant', 'to_status', 'created_at'], name='order_status_event_idx'), models.Index(fields=['order_id'], name='order_status_event_order_idx')],
+            },
+        ),
+    ]
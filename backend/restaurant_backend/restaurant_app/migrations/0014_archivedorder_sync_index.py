@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-18 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant_app', '0013_orderstatusevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['restaurant', 'archived_at'], name='archived_order_sync_idx'),
+        ),
+    ]
@@ -11,6 +11,7 @@ class Restaurant(models.Model):
     description = models.TextField(blank=True)
     address = models.TextField()
     no_of_tables = models.IntegerField(default=10)
+    frontend_base_url = models.CharField(max_length=255, blank=True)
     is_active = models.BooleanField(default=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -32,6 +33,14 @@ class Table(models.Model):
         null=True
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["restaurant", "table_number"],
+                name="unique_table_number_per_restaurant",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.restaurant.name} - Table {self.table_number}"
 
@@ -47,6 +56,12 @@ class MenuCategory(models.Model):
 
     class Meta:
         ordering = ["order"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["restaurant", "name"],
+                name="unique_category_name_per_restaurant",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -102,7 +117,26 @@ class Order(models.Model):
         choices=STATUS_CHOICES,
         default="pending"
     )
+    # Sum of unit_price * quantity over the order's lines, set when the
+    # order is placed.
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Kitchen order board: orders of one restaurant in a given
+            # status, newest first.
+            models.Index(
+                fields=["restaurant", "status", "-created_at"],
+                name="order_board_idx",
+            ),
+            # Board sync: orders of one restaurant changed since a point.
+            models.Index(
+                fields=["restaurant", "updated_at"],
+                name="order_changes_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - Table {self.table.table_number}"
@@ -118,7 +152,131 @@ class OrderItem(models.Model):
         on_delete=models.CASCADE
     )
     quantity = models.PositiveIntegerField(default=1)
+    # Menu price at the time of ordering; later price edits don't change it.
+    unit_price = models.DecimalField(max_digits=8, decimal_places=2)
 
     def __str__(self):
         return f"{self.item.name} x {self.quantity}"
 
+
+class ArchivedOrder(models.Model):
+    """
+    Served order moved out of the live Order/OrderItem tables. Line items
+    are stored denormalized with the price charged, so history stays
+    readable after menu items are edited or deleted.
+    """
+    restaurant = models.ForeignKey(
+        Restaurant,
+        on_delete=models.CASCADE,
+        related_name="archived_orders"
+    )
+    order_id = models.PositiveIntegerField(unique=True)
+    table_number = models.PositiveIntegerField(null=True)
+    status = models.CharField(max_length=20)
+    total = models.DecimalField(max_digits=10, decimal_places=2)
+    # [{"item_id", "name", "quantity", "unit_price"}, ...]
+    items = models.JSONField(default=list)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["restaurant", "created_at"],
+                name="archived_order_history_idx",
+            ),
+            # Tombstones for board syncs.
+            models.Index(
+                fields=["restaurant", "archived_at"],
+                name="archived_order_sync_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Archived order #{self.order_id}"
+
+class DailySales(models.Model):
+    """
+    Running per-restaurant, per-day counters, updated as orders are placed
+    and served so reports never scan the order tables.
+    """
+    restaurant = models.ForeignKey(
+        Restaurant,
+        on_delete=models.CASCADE,
+        related_name="daily_sales"
+    )
+    date = models.DateField()
+    orders = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    served = models.PositiveIntegerField(default=0)
+    # Sum of created -> served durations, for the average ticket time.
+    ticket_seconds = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["restaurant", "date"],
+                name="unique_daily_sales",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.restaurant_id} {self.date}"
+
+class DailyDishSales(models.Model):
+    restaurant = models.ForeignKey(
+        Restaurant,
+        on_delete=models.CASCADE,
+        related_name="daily_dish_sales"
+    )
+    date = models.DateField()
+    item = models.ForeignKey(
+        MenuItem,
+        on_delete=models.SET_NULL,
+        null=True
+    )
+    name = models.CharField(max_length=255)
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["restaurant", "date", "item"],
+                name="unique_daily_dish_sales",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} on {self.date}"
+
+class OrderStatusEvent(models.Model):
+    """
+    Append-only log of order status changes. Keyed by order id rather than
+    a foreign key so the history outlives archiving.
+    """
+    restaurant = models.ForeignKey(
+        Restaurant,
+        on_delete=models.CASCADE,
+        related_name="order_status_events"
+    )
+    order_id = models.PositiveIntegerField()
+    from_status = models.CharField(max_length=20)
+    to_status = models.CharField(max_length=20)
+    # When the order was placed, so each event carries its own latency.
+    placed_at = models.DateTimeField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Kitchen metrics: transitions into a status over a time window.
+            models.Index(
+                fields=["restaurant", "to_status", "created_at"],
+                name="order_status_event_idx",
+            ),
+            models.Index(fields=["order_id"], name="order_status_event_order_idx"),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id}: {self.from_status} -> {self.to_status}"
@@ -0,0 +1,83 @@
+import os
+import json
+import hashlib
+from django.conf import settings
+from ..filecache import FileCache
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_digest(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache(FileCache):
+    """
+    Bounded on-disk cache of OCR text and LLM replies, keyed by a hash of
+    their input.
+
+    Entries live under OCR_CACHE_DIR/<kind>/<digest[:2]>/<digest>.json. Reads
+    bump the file's mtime, and once the directory grows past
+    OCR_CACHE_MAX_BYTES the least recently used files are deleted.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.hits = {}
+        self.misses = {}
+
+    @property
+    def directory(self) -> str:
+        return str(settings.OCR_CACHE_DIR)
+
+    @property
+    def max_bytes(self) -> int:
+        return getattr(settings, "OCR_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+
+    def get(self, kind: str, digest: str):
+        data = self.read(self._path(kind, digest))
+
+        try:
+            value = json.loads(data) if data is not None else None
+        except ValueError:
+            value = None
+
+        self._count(self.misses if value is None else self.hits, kind)
+        return value
+
+    def put(self, kind: str, digest: str, value):
+        self.write(self._path(kind, digest), json.dumps(value).encode("utf-8"))
+
+    def stats(self) -> dict:
+        entries, size = self.usage()
+
+        with self._lock:
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+            }
+
+    def _path(self, kind: str, digest: str) -> str:
+        return os.path.join(self.directory, kind, digest[:2], f"{digest}.json")
+
+    def _count(self, counter: dict, kind: str):
+        with self._lock:
+            counter[kind] = counter.get(kind, 0) + 1
+
+
+ocr_cache = ResultCache()
@@ -0,0 +1,154 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from .pipeline import pipeline
+
+logger = logging.getLogger(__name__)
+
+# Rough share of the total work done once a stage has been reached; lets the
+# client draw a progress bar without knowing how the pipeline is built.
+STAGE_PROGRESS = {
+    "queued": 0,
+    "ocr": 10,
+    "llm": 60,
+    "parsing": 90,
+    "done": 100,
+    "failed": 100,
+}
+
+
+class QueueFull(Exception):
+    pass
+
+
+class OCRJobQueue:
+    """
+    In-process queue for menu uploads.
+
+    Jobs run on a bounded thread pool so a burst of uploads can only ever
+    occupy OCR_MAX_WORKERS threads; anything beyond OCR_MAX_PENDING waiting
+    jobs is rejected instead of piling up. Job state lives in memory and is
+    dropped OCR_JOB_TTL seconds after the job finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._executor = None
+
+    @property
+    def max_workers(self) -> int:
+        return getattr(settings, "OCR_MAX_WORKERS", 2)
+
+    @property
+    def max_pending(self) -> int:
+        return getattr(settings, "OCR_MAX_PENDING", 16)
+
+    @property
+    def ttl(self) -> int:
+        return getattr(settings, "OCR_JOB_TTL", 3600)
+
+    def submit(self, job_id: str, owner_id: int, image_paths: list) -> dict:
+        with self._lock:
+            self._prune()
+            waiting = sum(
+                1 for job in self._jobs.values()
+                if job["status"] in ("queued", "running")
+            )
+            if waiting >= self.max_pending:
+                raise QueueFull()
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="ocr-job",
+                )
+
+            job = {
+                "job_id": job_id,
+                "owner_id": owner_id,
+                "status": "queued",
+                "stage": "queued",
+                "result": None,
+                "error": None,
+                # Seconds per pipeline stage, filled in as the job runs.
+                "timings": {},
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+            self._jobs[job_id] = job
+            data = self.snapshot(job)
+
+        self._executor.submit(self._run, job_id, image_paths)
+        return data
+
+    def get(self, job_id: str, owner_id: int = None):
+        """
+        Snapshot of the job, or None if it is unknown, expired or (when
+        `owner_id` is given) belongs to someone else.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or (owner_id is not None and job["owner_id"] != owner_id):
+                return None
+            return self.snapshot(job)
+
+    def snapshot(self, job: dict) -> dict:
+        data = {
+            key: value for key, value in job.items()
+            if key != "owner_id"
+        }
+        data["timings"] = dict(job["timings"])
+        data["progress"] = STAGE_PROGRESS[job["stage"]]
+        return data
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _run(self, job_id: str, image_paths: list):
+        timings = {}
+        self._update(job_id, status="running", timings=timings)
+
+        try:
+            parsed = pipeline(
+                image_paths,
+                on_progress=lambda stage: self._update(job_id, stage=stage),
+                timings=timings,
+            )
+        except Exception as e:
+            logger.exception("OCR job %s failed", job_id)
+            self._update(
+                job_id,
+                status="failed",
+                stage="failed",
+                error=str(e),
+                finished_at=time.time(),
+            )
+        else:
+            self._update(
+                job_id,
+                status="done",
+                stage="done",
+                result=parsed,
+                finished_at=time.time(),
+            )
+        finally:
+            for image_path in image_paths:
+                if os.path.exists(image_path):
+                    os.remove(image_path)
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and job["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+jobs = OCRJobQueue()
@@ -0,0 +1,201 @@
+"""
+Rule-based menu parsing from OCR bounding boxes.
+
+Detections are stored as [x0, y0, x1, y1, text, confidence] lists. They are
+grouped into rows by their vertical centre; a row whose last box is a price
+is a dish, short or large rows without one are category headers, and the
+rest are descriptions of the dish above.
+"""
+import re
+import statistics
+
+PRICE_TOKEN = r"(?:rs\.?|inr|[₹$€£])?\s*(?P<price>\d[\d,]*(?:\.\d{1,2})?)\s*(?:/-)?"
+PRICE_ONLY = re.compile(rf"^{PRICE_TOKEN}$", re.IGNORECASE)
+PRICED_LINE = re.compile(rf"^(?P<name>.*?[^\W\d_].*?)[\s.·…_:-]*{PRICE_TOKEN}$", re.IGNORECASE)
+LEADERS = " .·…_:-"
+
+DEFAULT_CATEGORY = "Menu"
+HEADER_MAX_WORDS = 5
+TALL_ROW = 1.15
+SMALL_ROW = 0.9
+# Prices whose right edges are within this share of the page width of each
+# other count as one printed price column.
+ALIGN_TOLERANCE = 0.03
+MIN_DISHES = 3
+
+
+def normalise(results, offset_y: int = 0):
+    """
+    Detections from easyocr readtext(detail=1) results, shifted down by
+    `offset_y` pixels.
+    """
+    detections = []
+    for points, text, confidence in results:
+        xs = [point[0] for point in points]
+        ys = [point[1] for point in points]
+        detections.append([
+            int(min(xs)),
+            int(min(ys)) + offset_y,
+            int(max(xs)),
+            int(max(ys)) + offset_y,
+            str(text),
+            round(float(confidence), 3),
+        ])
+    return detections
+
+
+def _middle(detection) -> float:
+    return (detection[1] + detection[3]) / 2
+
+
+def _height(detection) -> int:
+    return max(1, detection[3] - detection[1])
+
+
+def rows(detections):
+    """
+    Detections grouped into text rows, top to bottom, each left to right.
+    """
+    grouped = []
+    for detection in sorted(detections, key=_middle):
+        if grouped:
+            row = grouped[-1]
+            if abs(_middle(detection) - row["middle"]) <= min(_height(detection), row["height"]) / 2:
+                row["items"].append(detection)
+                row["middle"] = statistics.fmean(_middle(d) for d in row["items"])
+                row["height"] = max(row["height"], _height(detection))
+                continue
+
+        grouped.append({
+            "items": [detection],
+            "middle": _middle(detection),
+            "height": _height(detection),
+        })
+
+    return [sorted(row["items"], key=lambda d: d[0]) for row in grouped]
+
+
+def page_text(detections) -> str:
+    return "\n".join(" ".join(d[4] for d in row) for row in rows(detections))
+
+
+def split_price(text: str):
+    """
+    (name, price) for a line ending in a price, otherwise None.
+    """
+    match = PRICED_LINE.match(text.strip())
+    if not match:
+        return None
+    return match["name"].strip(LEADERS), float(match["price"].replace(",", ""))
+
+
+def _line(row) -> dict:
+    text = " ".join(d[4] for d in row).strip()
+    line = {
+        "text": text,
+        "height": statistics.median(_height(d) for d in row),
+        "confidence": statistics.fmean(d[5] for d in row),
+        "name": None,
+        "price": None,
+        "price_right": None,
+        "split": False,
+    }
+
+    last = row[-1]
+    priced = split_price(text)
+
+    if priced and priced[0]:
+        line["name"], line["price"] = priced
+        line["price_right"] = last[2]
+    elif any(PRICE_ONLY.match(d[4].strip()) for d in row):
+        # A price in the middle of a row: two columns read as one, or a
+        # price with no name. Either way the rules cannot place it.
+        line["split"] = True
+
+    return line
+
+
+def _alignment(price_rights, width: int) -> float:
+    if len(price_rights) < 2:
+        return 0.5
+
+    tolerance = max(1, width * ALIGN_TOLERANCE)
+    clusters = [[]]
+    for right in sorted(price_rights):
+        if clusters[-1] and right - clusters[-1][-1] > tolerance:
+            clusters.append([])
+        clusters[-1].append(right)
+
+    aligned = sum(len(cluster) for cluster in clusters if len(cluster) > 1)
+    return aligned / len(price_rights)
+
+
+def parse_layout(detections):
+    """
+    Parses one page into the {"menu": [...]} schema. Returns the menu and
+    a 0-1 confidence: the share of rows the rules could place (half credit
+    for ambiguous ones), times the mean OCR confidence of the dish rows,
+    scaled by how well the prices line up in columns.
+    """
+    lines = [_line(row) for row in rows(detections)]
+    dish_lines = [line for line in lines if line["price"] is not None]
+
+    if not dish_lines:
+        return {"menu": []}, 0.0
+
+    dish_height = statistics.median(line["height"] for line in dish_lines)
+    menu = []
+    category = None
+    dish = None
+    explained = 0.0
+
+    for line in lines:
+        if line["split"]:
+            continue
+
+        if line["price"] is not None:
+            if category is None:
+                category = {"category": DEFAULT_CATEGORY, "dishes": []}
+                menu.append(category)
+                explained -= 0.5
+            dish = {
+                "name": line["name"],
+                "price": line["price"],
+                "description": None,
+                "ai_suggested_description": None,
+            }
+            category["dishes"].append(dish)
+            explained += 1
+            continue
+
+        text = line["text"]
+        if not text:
+            continue
+
+        words = len(text.split())
+        tall = line["height"] >= dish_height * TALL_ROW
+        small = line["height"] <= dish_height * SMALL_ROW
+
+        if dish and (words > HEADER_MAX_WORDS or text[0].islower() or small):
+            dish["description"] = f'{dish["description"]} {text}' if dish["description"] else text
+            explained += 1
+        elif words <= HEADER_MAX_WORDS:
+            # A short row the size of a dish name could be either a header
+            # or a one-line description, so it only earns half credit.
+            category = {"category": text.strip(LEADERS), "dishes": []}
+            menu.append(category)
+            dish = None
+            explained += 1 if text.isupper() or tall else 0.5
+
+    width = max(d[2] for d in detections) - min(d[0] for d in detections)
+    alignment = _alignment([line["price_right"] for line in dish_lines], width)
+    ocr_confidence = statistics.fmean(line["confidence"] for line in dish_lines)
+
+    confidence = (
+        max(0.0, explained) / len(lines)
+        * ocr_confidence
+        * (0.5 + 0.5 * alignment)
+        * min(1.0, len(dish_lines) / MIN_DISHES)
+    )
+
+    return {"menu": [c for c in menu if c["dishes"]]}, round(confidence, 3)
@@ -0,0 +1,125 @@
+import os
+import re
+import json
+import time
+from django.conf import settings
+from dotenv import load_dotenv
+from .layout import DEFAULT_CATEGORY, split_price
+
+load_dotenv()
+
+API_KEY = os.getenv("API_KEY")
+
+MENU_TEXT_MARKER = "MENU TEXT:"
+PAGE_MARKER = re.compile(r"^-+ Page \d+ -+$")
+LOCAL_CHUNK_SIZE = 64
+
+
+class LLMBackend:
+    """
+    Something that turns the menu prompt into a JSON reply.
+
+    `name` selects the backend in LLM_BACKEND and, with `model`, keys the
+    reply cache. stream() yields the reply text in chunks.
+    """
+
+    name = None
+    model = None
+
+    def load(self):
+        pass
+
+    def stream(self, messages):
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+    model = "gemini-2.5-flash"
+
+    def __init__(self):
+        self._client = None
+
+    def load(self):
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        self._client = ChatGoogleGenerativeAI(
+            model=self.model,
+            google_api_key=API_KEY,
+            temperature=0.2
+        )
+
+    def stream(self, messages):
+        for chunk in self._client.stream(messages):
+            if chunk.content:
+                yield chunk.content
+
+
+class LocalBackend(LLMBackend):
+    """
+    Deterministic offline stand-in for tests and load tests.
+
+    Lines ending in a price become dishes, other lines start a new
+    category. LLM_LOCAL_LATENCY_MS spreads a fake response time over the
+    streamed chunks.
+    """
+
+    name = "local"
+    model = "rules-v1"
+
+    def stream(self, messages):
+        reply = json.dumps(self.parse(self.menu_text(messages)))
+        chunks = [
+            reply[i:i + LOCAL_CHUNK_SIZE]
+            for i in range(0, len(reply), LOCAL_CHUNK_SIZE)
+        ]
+        delay = getattr(settings, "LLM_LOCAL_LATENCY_MS", 0) / 1000 / len(chunks)
+
+        for chunk in chunks:
+            if delay:
+                time.sleep(delay)
+            yield chunk
+
+    def menu_text(self, messages) -> str:
+        content = messages[-1].content
+        return content.split(MENU_TEXT_MARKER, 1)[-1]
+
+    def parse(self, text: str) -> dict:
+        menu = []
+        category = None
+
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or PAGE_MARKER.match(line):
+                continue
+
+            priced = split_price(line)
+            if not priced:
+                category = {"category": line, "dishes": []}
+                menu.append(category)
+                continue
+
+            if category is None:
+                category = {"category": DEFAULT_CATEGORY, "dishes": []}
+                menu.append(category)
+
+            category["dishes"].append({
+                "name": priced[0],
+                "price": priced[1],
+                "description": None,
+                "ai_suggested_description": None,
+            })
+
+        return {"menu": [section for section in menu if section["dishes"]]}
+
+
+BACKENDS = {backend.name: backend for backend in (GeminiBackend, LocalBackend)}
+
+
+def backend_class(name: str = None):
+    name = name or getattr(settings, "LLM_BACKEND", "gemini")
+
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown LLM backend {name!r}, expected one of {sorted(BACKENDS)}")
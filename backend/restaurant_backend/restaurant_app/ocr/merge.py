@@ -0,0 +1,38 @@
+def _key(name) -> str:
+    return " ".join(str(name or "").split()).casefold()
+
+
+def merge_menus(menus):
+    """
+    Combines several {"menu": [...]} parses (e.g. one per page) into one.
+
+    Categories with the same name are merged in first-seen order, and a
+    dish repeated within a category (a page overlap, or the same dish
+    listed twice) is kept once, filling in a missing price or description
+    from the later copy.
+    """
+    categories = {}
+
+    for menu in menus:
+        for section in (menu or {}).get("menu") or []:
+            if not isinstance(section, dict):
+                continue
+
+            name = str(section.get("category") or "").strip() or "Other"
+            category = categories.setdefault(_key(name), {"category": name, "dishes": {}})
+
+            for dish in section.get("dishes") or []:
+                if not isinstance(dish, dict) or not _key(dish.get("name")):
+                    continue
+
+                existing = category["dishes"].setdefault(_key(dish["name"]), dict(dish))
+                for field, value in dish.items():
+                    if existing.get(field) in (None, "") and value not in (None, ""):
+                        existing[field] = value
+
+    return {
+        "menu": [
+            {"category": c["category"], "dishes": list(c["dishes"].values())}
+            for c in categories.values()
+        ]
+    }
@@ -0,0 +1,81 @@
+from django.conf import settings
+from .cache import file_digest, text_digest
+
+PDF_POINTS_PER_INCH = 72
+# Bumped whenever the shape of cached OCR results changes.
+OCR_RESULT_FORMAT = "boxes-v1"
+
+
+class TooManyPages(ValueError):
+    pass
+
+
+def is_pdf(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(5) == b"%PDF-"
+
+
+def preprocess_config() -> str:
+    # Preprocessing changes what the reader sees, so its settings are part
+    # of every OCR cache key along with the image bytes.
+    return "{}:{}:{}:{}".format(
+        OCR_RESULT_FORMAT,
+        getattr(settings, "OCR_PREPROCESS", True),
+        getattr(settings, "OCR_TARGET_DPI", 200),
+        getattr(settings, "OCR_TILE_COLUMNS", False),
+    )
+
+
+def _pdf_page_loader(path: str, index: int, dpi: int):
+    def load():
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            return pdf[index].render(scale=dpi / PDF_POINTS_PER_INCH).to_pil()
+        finally:
+            pdf.close()
+
+    return load
+
+
+def expand_pages(paths, max_pages: int):
+    """
+    One (cache key, source) pair per menu page, in upload order. `source`
+    is an image path, or for PDF pages a callable rendering the page to a
+    PIL image at OCR_TARGET_DPI, so cached pages are never rendered.
+    """
+    config = preprocess_config()
+    dpi = getattr(settings, "OCR_TARGET_DPI", 200)
+    pages = []
+
+    for path in paths:
+        digest = file_digest(path)
+
+        if not is_pdf(path):
+            pages.append((text_digest(digest, config), path))
+            continue
+
+        try:
+            import pypdfium2
+        except ImportError:
+            raise ValueError("PDF menus need the pypdfium2 package installed")
+
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            page_count = len(pdf)
+        finally:
+            pdf.close()
+
+        pages += [
+            (text_digest(digest, config, f"page:{index}"), _pdf_page_loader(path, index, dpi))
+            for index in range(page_count)
+        ]
+
+        if len(pages) > max_pages:
+            break
+
+    if len(pages) > max_pages:
+        raise TooManyPages(f"A menu can have at most {max_pages} pages")
+
+    return pages
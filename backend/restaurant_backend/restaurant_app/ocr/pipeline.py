@@ -1,19 +1,88 @@
-import easyocr, os
-from dotenv import load_dotenv
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Optional
+import numpy as np
+from django.conf import settings
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from .registry import registry
+from .llm import backend_class
+from .schema import MenuSchemaError, MenuStreamParser, parse_menu_reply
+from .preprocess import preprocess
+from .cache import ocr_cache, file_digest, text_digest
+from .pages import expand_pages, preprocess_config
+from .merge import merge_menus
+from .layout import normalise, page_text, parse_layout
 
-load_dotenv()
+# Preprocessing is mostly PIL and numpy work that releases the GIL; LLM calls
+# are network-bound.
+PREPROCESS_WORKERS = 4
+LLM_PARALLEL_CALLS = 4
 
-API_KEY = os.getenv("API_KEY")
+logger = logging.getLogger(__name__)
 
-def pipeline( path: str, ) -> str:
-    reader = easyocr.Reader(['en'], gpu=False)
-    ocrtext = reader.readtext(path, detail=0, paragraph=True)
+def ocr_cache_key(path: str) -> str:
+    return text_digest(file_digest(path), preprocess_config())
 
-    menu_text = "\n".join(ocrtext)
+def _raw_image(source):
+    return np.asarray(source()) if callable(source) else source
 
+def read_pages(sources, timings: dict):
+    """
+    OCR detections (see layout.normalise) for each page source (see
+    expand_pages). Pages are preprocessed on a thread pool and their tiles
+    read in one batch, in parallel when OCR_TILE_WORKERS > 1.
+    """
+    workers = getattr(settings, "OCR_TILE_WORKERS", 1)
+
+    if not getattr(settings, "OCR_PREPROCESS", True):
+        start = time.perf_counter()
+        results = registry.readtext_tiles(
+            [_raw_image(source) for source in sources],
+            workers=workers,
+            detail=1,
+            paragraph=False,
+        )
+        timings["ocr"] = time.perf_counter() - start
+        return [normalise(result) for result in results]
+
+    # PDF rendering is not thread-safe, so pages are rendered up front.
+    images = [source() if callable(source) else source for source in sources]
+
+    with ThreadPoolExecutor(max_workers=min(len(images), PREPROCESS_WORKERS)) as pool:
+        prepared = list(pool.map(
+            lambda image: preprocess(
+                image,
+                target_dpi=getattr(settings, "OCR_TARGET_DPI", 200),
+                tile=getattr(settings, "OCR_TILE_COLUMNS", False),
+            ),
+            images,
+        ))
+
+    tiles = []
+    tile_pages = []
+    for page, (page_tiles, stage_timings) in enumerate(prepared):
+        for stage, seconds in stage_timings.items():
+            registry.record_call(f"preprocess.{stage}", seconds)
+            timings[f"preprocess.{stage}"] = timings.get(f"preprocess.{stage}", 0) + seconds
+        tiles += page_tiles
+        tile_pages += [page] * len(page_tiles)
+
+    start = time.perf_counter()
+    results = registry.readtext_tiles(tiles, workers=workers, detail=1, paragraph=False)
+    timings["ocr"] = time.perf_counter() - start
+
+    # Columns are read left to right, so each one is placed below the last
+    # to keep that reading order.
+    detections = [[] for _ in sources]
+    offsets = [0] * len(sources)
+    for page, tile, result in zip(tile_pages, tiles, results):
+        detections[page] += normalise(result, offset_y=offsets[page])
+        offsets[page] += tile.shape[0]
+
+    return detections
+
+def build_messages(menu_text: str):
     prompt = ChatPromptTemplate.from_messages([
     (
             "system",
@@ -72,14 +141,123 @@ def pipeline( path: str, ) -> str:
         )
     ])
 
+    return prompt.format_messages(menu_text=menu_text)
+
+def llm_cache_key(messages) -> str:
+    # Keyed on the full prompt, so editing the instructions or switching
+    # backends or models never serves a stale parse.
+    backend = backend_class()
+    return text_digest(backend.name, backend.model, *(m.content for m in messages))
+
+def stream_menu(messages):
+    """
+    One LLM call, parsed as it streams. Returns the reply text and menu, or
+    raises MenuSchemaError as soon as the reply goes off-schema.
+    """
+    parser = MenuStreamParser()
+
+    for chunk in registry.stream_llm(messages):
+        if parser.feed(chunk):
+            break
+
+    return parser.text, parser.close()
+
+def parse_menu_text(menu_text: str) -> dict:
+    messages = build_messages(menu_text)
+    llm_key = llm_cache_key(messages)
+    content = ocr_cache.get("llm", llm_key)
+
+    if content is not None:
+        try:
+            return parse_menu_reply(content)
+        except MenuSchemaError:
+            pass
+
+    attempts = getattr(settings, "LLM_MAX_ATTEMPTS", 3)
+    for attempt in range(1, attempts + 1):
+        try:
+            content, menu = stream_menu(messages)
+            break
+        except Exception as e:
+            if attempt == attempts:
+                raise
+            delay = getattr(settings, "LLM_RETRY_BACKOFF", 1.0) * 2 ** (attempt - 1)
+            logger.warning("LLM attempt %d failed (%s), retrying in %.1fs", attempt, e, delay)
+            time.sleep(delay)
+
+    # Only replies that validate are kept; a bad one is retried next time.
+    ocr_cache.put("llm", llm_key, content)
+    return menu
+
+def llm_batches(texts):
+    """
+    Page texts go to the LLM together when they fit in OCR_LLM_MAX_CHARS,
+    otherwise one call per page and the parses are merged afterwards.
+    """
+    if len(texts) == 1:
+        return texts
+
+    if sum(len(text) for text in texts) > getattr(settings, "OCR_LLM_MAX_CHARS", 12000):
+        return texts
+
+    return ["\n\n".join(
+        f"--- Page {number} ---\n{text}"
+        for number, text in enumerate(texts, start=1)
+    )]
+
+def pipeline(
+    paths,
+    on_progress: Optional[Callable[[str], None]] = None,
+    timings: Optional[dict] = None,
+) -> dict:
+    """
+    Reads one or more menu images or PDFs and returns the merged
+    {"menu": [...]} parse.
+    """
+    timings = {} if timings is None else timings
+    paths = [paths] if isinstance(paths, str) else list(paths)
+
+    if on_progress:
+        on_progress("ocr")
+
+    pages = expand_pages(paths, getattr(settings, "OCR_MAX_PAGES", 20))
+    detections = [ocr_cache.get("ocr", key) for key, _ in pages]
+    missing = [index for index, page in enumerate(detections) if page is None]
+
+    if missing:
+        for index, page in zip(missing, read_pages([pages[i][1] for i in missing], timings)):
+            detections[index] = page
+            ocr_cache.put("ocr", pages[index][0], page)
+
+    menus = [None] * len(pages)
+    if getattr(settings, "OCR_FAST_PATH", True):
+        start = time.perf_counter()
+        for index, page in enumerate(detections):
+            menu, confidence = parse_layout(page)
+            logger.info("Page %d parsed by layout with confidence %.2f", index + 1, confidence)
+            if confidence >= getattr(settings, "OCR_FAST_PATH_MIN_CONFIDENCE", 0.7):
+                menus[index] = menu
+        timings["layout"] = time.perf_counter() - start
+        registry.record_call("layout", timings["layout"])
+
+    # Only pages the rules are unsure of go to the LLM.
+    llm_pages = [index for index, menu in enumerate(menus) if menu is None]
+
+    if llm_pages:
+        if on_progress:
+            on_progress("llm")
+
+        batches = llm_batches([page_text(detections[index]) for index in llm_pages])
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(len(batches), LLM_PARALLEL_CALLS)) as pool:
+            results = list(pool.map(parse_menu_text, batches))
+        timings["llm"] = time.perf_counter() - start
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        google_api_key=API_KEY,
-        temperature=0.2  
-    )
+        # One reply per page, or a single reply placed at the first page.
+        for index, menu in zip(llm_pages, results):
+            menus[index] = menu
 
-    messages = prompt.format_messages(menu_text=menu_text)
+    if on_progress:
+        on_progress("parsing")
 
-    response = llm.invoke(messages)
-    return response.content
+    return merge_menus(menu for menu in menus if menu is not None)
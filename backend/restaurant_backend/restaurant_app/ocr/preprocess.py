@@ -0,0 +1,169 @@
+import time
+import numpy as np
+from PIL import Image, ImageOps
+
+# Menus are treated as A4 pages when converting the target DPI to pixels;
+# phone photos carry no reliable physical size of their own.
+PAGE_LONG_SIDE_INCHES = 11.69
+DEFAULT_TARGET_DPI = 200
+
+DESKEW_MAX_ANGLE = 5.0
+DESKEW_STEP = 0.5
+DESKEW_SAMPLE_SIDE = 800
+
+# A gutter is a run of (almost) ink-free columns at least this share of the
+# page wide; each resulting column must be at least MIN_COLUMN_SHARE wide.
+GUTTER_MIN_SHARE = 0.02
+GUTTER_MAX_INK = 0.002
+MIN_COLUMN_SHARE = 0.15
+
+
+def max_side_for(target_dpi: int) -> int:
+    return int(PAGE_LONG_SIDE_INCHES * target_dpi)
+
+
+def load(source, target_dpi: int = DEFAULT_TARGET_DPI) -> Image.Image:
+    """
+    Opens an image path; already-decoded images (rendered PDF pages) pass
+    straight through.
+    """
+    if isinstance(source, Image.Image):
+        return source
+
+    image = Image.open(source)
+    # JPEGs can be decoded straight to grayscale at 1/2, 1/4 or 1/8 scale,
+    # which is much cheaper than decoding all 12+ megapixels and resizing.
+    scale = max_side_for(target_dpi) / max(image.size)
+    image.draft("L", (int(image.width * scale), int(image.height * scale)))
+    # Phone cameras store rotation in EXIF instead of rotating the pixels.
+    return ImageOps.exif_transpose(image)
+
+
+def grayscale(image: Image.Image) -> Image.Image:
+    return image.convert("L")
+
+
+def downscale(image: Image.Image, target_dpi: int = DEFAULT_TARGET_DPI) -> Image.Image:
+    """
+    Shrinks the image so its long side is no bigger than an A4 page at
+    `target_dpi`. Smaller images are left alone.
+    """
+    scale = max_side_for(target_dpi) / max(image.size)
+
+    if scale >= 1:
+        return image
+
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.Resampling.LANCZOS)
+
+
+def ink_threshold(pixels: np.ndarray) -> float:
+    """
+    Otsu threshold separating text from background in a grayscale array.
+    """
+    histogram = np.bincount(pixels.ravel(), minlength=256).astype(float)
+    total = histogram.sum()
+    levels = np.arange(256)
+
+    weight_bg = np.cumsum(histogram)
+    weight_fg = total - weight_bg
+    mean_bg = np.cumsum(histogram * levels)
+    mean_all = mean_bg[-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mean_all * weight_bg / total - mean_bg) ** 2 / (weight_bg * weight_fg)
+
+    return float(np.argmax(np.nan_to_num(between)))
+
+
+def skew_angle(image: Image.Image) -> float:
+    """
+    Angle (degrees) that makes text lines horizontal, found by rotating a
+    small copy and keeping the angle with the sharpest row ink profile.
+    """
+    sample = image.copy()
+    sample.thumbnail((DESKEW_SAMPLE_SIDE, DESKEW_SAMPLE_SIDE))
+    pixels = np.asarray(sample)
+    ink = Image.fromarray(((pixels < ink_threshold(pixels)) * 255).astype(np.uint8))
+
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-DESKEW_MAX_ANGLE, DESKEW_MAX_ANGLE + DESKEW_STEP / 2, DESKEW_STEP):
+        rows = np.asarray(ink.rotate(angle, resample=Image.Resampling.NEAREST)).sum(axis=1, dtype=float)
+        score = float(np.sum(np.diff(rows) ** 2))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+
+    return best_angle
+
+
+def deskew(image: Image.Image) -> Image.Image:
+    angle = skew_angle(image)
+
+    if abs(angle) < DESKEW_STEP:
+        return image
+
+    return image.rotate(
+        angle,
+        resample=Image.Resampling.BICUBIC,
+        expand=True,
+        fillcolor=255,
+    )
+
+
+def split_columns(image: Image.Image):
+    """
+    Splits a multi-column menu at its vertical gutters. Returns a list of
+    images, left to right; a single-column page comes back whole.
+    """
+    pixels = np.asarray(image)
+    height, width = pixels.shape
+    ink_per_column = (pixels < ink_threshold(pixels)).sum(axis=0) / height
+
+    blank = ink_per_column <= GUTTER_MAX_INK
+    min_gutter = max(1, int(width * GUTTER_MIN_SHARE))
+    min_column = int(width * MIN_COLUMN_SHARE)
+
+    cuts = []
+    start = None
+    for x in range(width + 1):
+        if x < width and blank[x]:
+            if start is None:
+                start = x
+            continue
+
+        if start is not None:
+            # Only interior gutters split columns; page margins do not.
+            if start > 0 and x < width and x - start >= min_gutter:
+                cuts.append((start + x) // 2)
+            start = None
+
+    edges = [0]
+    for cut in cuts:
+        if cut - edges[-1] >= min_column and width - cut >= min_column:
+            edges.append(cut)
+    edges.append(width)
+
+    return [image.crop((left, 0, right, height)) for left, right in zip(edges, edges[1:])]
+
+
+def preprocess(source, target_dpi: int = DEFAULT_TARGET_DPI, tile: bool = False):
+    """
+    Loads a menu photo (path or PIL image) and prepares it for OCR. Returns
+    the list of numpy arrays to read (one per column when `tile` is set) and
+    the seconds spent in each stage.
+    """
+    timings = {}
+
+    def stage(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[name] = time.perf_counter() - start
+        return result
+
+    image = stage("load", load, source, target_dpi)
+    image = stage("grayscale", grayscale, image)
+    image = stage("downscale", downscale, image, target_dpi)
+    image = stage("deskew", deskew, image)
+    tiles = stage("tile", split_columns, image) if tile else [image]
+
+    return [np.asarray(t) for t in tiles], timings
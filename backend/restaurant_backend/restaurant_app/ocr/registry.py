@@ -0,0 +1,151 @@
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import easyocr
+from .llm import LLMBackend, backend_class
+from .workers import init_worker, readtext as worker_readtext
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for the EasyOCR reader and the LLM backend.
+
+    Both are built once (on first use or via warm_up()) and shared by every
+    request in the worker. EasyOCR inference is not guaranteed to be
+    thread-safe, so calls to the reader are serialised behind a lock.
+    """
+
+    def __init__(self):
+        self._load_lock = threading.Lock()
+        self._reader_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._reader = None
+        self._llm = None
+        self._tile_pool = None
+        self._tile_workers = None
+        self.load_times = {}
+        self.call_stats = {}
+
+    def get_reader(self) -> easyocr.Reader:
+        if self._reader is None:
+            with self._load_lock:
+                if self._reader is None:
+                    start = time.perf_counter()
+                    self._reader = easyocr.Reader(['en'], gpu=False)
+                    self._record_load("reader", time.perf_counter() - start)
+        return self._reader
+
+    def get_llm(self) -> LLMBackend:
+        if self._llm is None:
+            with self._load_lock:
+                if self._llm is None:
+                    start = time.perf_counter()
+                    llm = backend_class()()
+                    llm.load()
+                    self._llm = llm
+                    self._record_load("llm", time.perf_counter() - start)
+        return self._llm
+
+    def readtext(self, image, **kwargs):
+        reader = self.get_reader()
+        with self._reader_lock:
+            with self.timed("ocr"):
+                return reader.readtext(image, **kwargs)
+
+    def readtext_tiles(self, images, workers: int = 1, **kwargs):
+        """
+        OCR for several images, returning one result list per image. With
+        workers > 1 the images are read in parallel by a pool of processes,
+        each holding its own reader.
+        """
+        if workers <= 1 or len(images) <= 1:
+            return [self.readtext(image, **kwargs) for image in images]
+
+        pool = self.get_tile_pool(workers)
+        with self.timed("ocr"):
+            return list(pool.map(worker_readtext, images, [kwargs] * len(images)))
+
+    def get_tile_pool(self, workers: int) -> ProcessPoolExecutor:
+        """
+        The process pool for `workers` workers. A different count than the
+        running pool's (OCR_TILE_WORKERS changed) replaces it; work already
+        submitted to the old pool still finishes.
+        """
+        with self._load_lock:
+            if self._tile_pool is None or self._tile_workers != workers:
+                if self._tile_pool is not None:
+                    self._tile_pool.shutdown(wait=False)
+
+                # Forking a process that has torch loaded and threads
+                # running is unsafe, so workers start fresh.
+                self._tile_pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker,
+                    initargs=(workers,),
+                )
+                self._tile_workers = workers
+
+            return self._tile_pool
+
+    def stream_llm(self, messages):
+        llm = self.get_llm()
+        with self.timed("llm"):
+            yield from llm.stream(messages)
+
+    def warm_up(self):
+        self.get_reader()
+        self.get_llm()
+
+    def timed(self, name: str):
+        return _Timer(self, name)
+
+    def record_call(self, name: str, seconds: float):
+        with self._stats_lock:
+            stat = self.call_stats.setdefault(
+                name, {"count": 0, "total": 0.0, "last": 0.0, "max": 0.0}
+            )
+            stat["count"] += 1
+            stat["total"] += seconds
+            stat["last"] = seconds
+            stat["max"] = max(stat["max"], seconds)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "loaded": {
+                    "reader": self._reader is not None,
+                    "llm": self._llm is not None,
+                },
+                "load_times": dict(self.load_times),
+                "calls": {
+                    name: dict(stat, avg=stat["total"] / stat["count"])
+                    for name, stat in self.call_stats.items()
+                },
+            }
+
+    def _record_load(self, name: str, seconds: float):
+        self.load_times[name] = seconds
+        logger.info("Loaded %s in %.2fs", name, seconds)
+
+
+class _Timer:
+    def __init__(self, registry: ModelRegistry, name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        self.registry.record_call(self.name, self.elapsed)
+        return False
+
+
+registry = ModelRegistry()
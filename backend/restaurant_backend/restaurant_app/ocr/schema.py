@@ -0,0 +1,190 @@
+import json
+
+FENCE = "```"
+DISH_TEXT_FIELDS = ("description", "ai_suggested_description")
+MAX_REPORTED_ERRORS = 20
+
+
+class MenuSchemaError(ValueError):
+    def __init__(self, errors):
+        super().__init__("LLM reply is not a valid menu: " + "; ".join(errors))
+        self.errors = errors
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.replace(",", "").strip())
+        except ValueError:
+            return None
+    return None
+
+
+def validate_menu(data) -> dict:
+    """
+    Checks a parsed reply against the {"menu": [{"category", "dishes"}]}
+    schema the prompt asks for, and returns it normalised. Numeric price
+    strings are accepted; anything else off-schema is an error.
+    """
+    errors = []
+
+    if not isinstance(data, dict) or not isinstance(data.get("menu"), list):
+        raise MenuSchemaError(['expected an object with a "menu" list'])
+
+    menu = []
+    for i, section in enumerate(data["menu"]):
+        where = f"menu[{i}]"
+
+        if not isinstance(section, dict):
+            errors.append(f"{where} is not an object")
+            continue
+
+        category = section.get("category")
+        if not isinstance(category, str) or not category.strip():
+            errors.append(f"{where}.category must be a non-empty string")
+
+        dishes = section.get("dishes")
+        if not isinstance(dishes, list):
+            errors.append(f"{where}.dishes must be a list")
+            continue
+
+        cleaned = []
+        for j, dish in enumerate(dishes):
+            where = f"menu[{i}].dishes[{j}]"
+
+            if not isinstance(dish, dict):
+                errors.append(f"{where} is not an object")
+                continue
+
+            name = dish.get("name")
+            if not isinstance(name, str) or not name.strip():
+                errors.append(f"{where}.name must be a non-empty string")
+
+            price = dish.get("price")
+            if price is not None:
+                price = _number(price)
+                if price is None or price < 0:
+                    errors.append(f"{where}.price must be a number or null")
+
+            for field in DISH_TEXT_FIELDS:
+                if dish.get(field) is not None and not isinstance(dish[field], str):
+                    errors.append(f"{where}.{field} must be a string or null")
+
+            cleaned.append({
+                "name": name.strip() if isinstance(name, str) else name,
+                "price": price,
+                **{field: dish.get(field) for field in DISH_TEXT_FIELDS},
+            })
+
+        menu.append({
+            "category": category.strip() if isinstance(category, str) else category,
+            "dishes": cleaned,
+        })
+
+    if errors:
+        raise MenuSchemaError(errors[:MAX_REPORTED_ERRORS])
+
+    return {"menu": menu}
+
+
+class MenuStreamParser:
+    """
+    Parses a menu reply as it streams in.
+
+    Leading whitespace and a markdown fence are skipped; after that the
+    reply must start with "{", so one that opens with anything else fails
+    on its first characters rather than after the whole response. The
+    document is complete as soon as its outer braces balance, and any text
+    after it is ignored rather than waited for.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.result = None
+        self._start = None
+        self._scanned = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Adds a chunk of the reply. Returns True once the menu is complete.
+        """
+        if self.done:
+            return True
+
+        self.text += chunk
+
+        if self._start is None:
+            self._find_start()
+            if self._start is None:
+                return False
+
+        for index in range(self._scanned, len(self.text)):
+            char = self.text[index]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish(self.text[self._start:index + 1])
+                    return True
+
+        self._scanned = len(self.text)
+        return False
+
+    def close(self) -> dict:
+        if not self.done:
+            raise MenuSchemaError(["reply ended before the JSON was complete"])
+        return self.result
+
+    def _find_start(self):
+        text = self.text.lstrip()
+
+        # Wait until a possible fence has fully arrived before judging it.
+        if FENCE.startswith(text) or (text.startswith(FENCE) and "\n" not in text):
+            return
+
+        if text.startswith(FENCE):
+            text = text[text.index("\n") + 1:].lstrip()
+
+        if not text:
+            return
+        if text[0] != "{":
+            raise MenuSchemaError([f"expected a JSON object, got {text[:20]!r}"])
+
+        self._start = len(self.text) - len(text)
+        self._scanned = self._start
+
+    def _finish(self, document: str):
+        try:
+            data = json.loads(document)
+        except json.JSONDecodeError as e:
+            raise MenuSchemaError([f"invalid JSON: {e}"])
+
+        self.result = validate_menu(data)
+
+
+def parse_menu_reply(content: str) -> dict:
+    parser = MenuStreamParser()
+    parser.feed(content)
+    return parser.close()
@@ -0,0 +1,22 @@
+"""
+Entry points for the OCR tile process pool. Kept free of Django imports so
+spawned workers start quickly.
+"""
+import os
+
+_reader = None
+
+
+def init_worker(workers: int):
+    global _reader
+    import torch
+    import easyocr
+
+    # Split the cores between the workers instead of each torch runtime
+    # trying to use all of them.
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    _reader = easyocr.Reader(['en'], gpu=False)
+
+
+def readtext(image, kwargs):
+    return _reader.readtext(image, **kwargs)
@@ -0,0 +1,55 @@
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from ..models import Order, ArchivedOrder
+
+ARCHIVE_BATCH_SIZE = 500
+
+
+def archive_order(order) -> ArchivedOrder:
+    items = [
+        {
+            "item_id": oi.item_id,
+            "name": oi.item.name,
+            "quantity": oi.quantity,
+            "unit_price": str(oi.unit_price),
+        }
+        for oi in order.items.all()
+    ]
+
+    return ArchivedOrder(
+        restaurant_id=order.restaurant_id,
+        order_id=order.id,
+        table_number=order.table.table_number if order.table else None,
+        status=order.status,
+        total=order.total,
+        items=items,
+        created_at=order.created_at,
+        updated_at=order.updated_at,
+    )
+
+
+def archive_served_orders(older_than_hours: float, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Moves served orders last changed more than `older_than_hours` ago into
+    ArchivedOrder, one batch per transaction. Returns how many were moved.
+    """
+    cutoff = timezone.now() - timedelta(hours=older_than_hours)
+    archived = 0
+
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Order.objects.filter(status="served", updated_at__lt=cutoff)
+                .select_related("table")
+                .prefetch_related("items__item")
+                .order_by("id")[:batch_size]
+            )
+
+            if not batch:
+                return archived
+
+            ArchivedOrder.objects.bulk_create([archive_order(o) for o in batch])
+            Order.objects.filter(id__in=[o.id for o in batch]).delete()
+
+        archived += len(batch)
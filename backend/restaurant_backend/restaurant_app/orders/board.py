@@ -0,0 +1,151 @@
+import base64
+from datetime import datetime, timedelta
+from django.db.models import Q
+from django.utils import timezone
+from ..models import Order, ArchivedOrder
+
+BOARD_STATUSES = {
+    "open": ["pending", "preparing", "ready"],
+    "served": ["served"],
+    "all": ["pending", "preparing", "ready", "served"],
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# updated_at is stamped before commit, so a slow transaction can commit a
+# change older than one already synced. Sync tokens never advance past
+# now - SYNC_SAFETY_MARGIN; the window behind that is re-read on the next
+# sync, so clients must apply changes by order_id. Transactions are assumed
+# to commit within the margin.
+SYNC_SAFETY_MARGIN = timedelta(seconds=10)
+# Archived order ids reported per sync before the client is told to reload.
+MAX_TOMBSTONES = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def serialize_order(order):
+    return {
+        "order_id": order.id,
+        "table_number": order.table.table_number if order.table else None,
+        "status": order.status,
+        "created_at": order.created_at,
+        "total": order.total,
+        "items": [
+            {
+                "name": oi.item.name,
+                "quantity": oi.quantity,
+                "price": oi.unit_price,
+                "is_veg": oi.item.is_veg,
+            }
+            for oi in order.items.all()
+        ],
+    }
+
+
+def encode_cursor(timestamp: datetime, order_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(order_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def board_page(restaurant, statuses, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of the order board, newest first. Keyset pagination on
+    (created_at, id) keeps every page an index range scan, however deep.
+    """
+    orders = Order.objects.filter(
+        restaurant=restaurant,
+        status__in=statuses
+    )
+
+    if cursor:
+        created_at, order_id = decode_cursor(cursor)
+        orders = orders.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=order_id)
+        )
+
+    page = list(
+        orders.prefetch_related("items__item", "table")
+        .order_by("-created_at", "-id")[:limit + 1]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    return {
+        "orders": [serialize_order(o) for o in page],
+        "next_cursor": encode_cursor(page[-1].created_at, page[-1].id) if has_more else None,
+    }
+
+
+def _settled(position):
+    """
+    A (timestamp, id) sync position, held back to the safety horizon.
+    """
+    horizon = timezone.now() - SYNC_SAFETY_MARGIN
+    return position if position[0] <= horizon else (horizon, 0)
+
+
+def sync_token(restaurant):
+    """
+    Marks the latest settled change for the restaurant; passing it back as
+    ?since= returns the orders created or changed after this point.
+    """
+    latest = Order.objects.filter(
+        restaurant=restaurant
+    ).order_by("-updated_at", "-id").values_list("updated_at", "id").first()
+
+    if latest is None:
+        return encode_cursor(datetime.fromtimestamp(0).astimezone(), 0)
+
+    return encode_cursor(*_settled(latest))
+
+
+def board_changes(restaurant, since, limit=DEFAULT_PAGE_SIZE):
+    """
+    Orders created or changed after the `since` token, oldest change first,
+    plus the ids of orders archived since then under "removed". When more
+    than MAX_TOMBSTONES were archived, "resync" asks the client to reload
+    the board instead.
+    """
+    updated_at, order_id = decode_cursor(since)
+
+    changes = list(
+        Order.objects.filter(restaurant=restaurant)
+        .filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=order_id))
+        .prefetch_related("items__item", "table")
+        .order_by("updated_at", "id")[:limit + 1]
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    removed = list(
+        ArchivedOrder.objects.filter(restaurant=restaurant, archived_at__gt=updated_at)
+        .order_by("archived_at", "order_id")
+        .values_list("order_id", flat=True)[:MAX_TOMBSTONES + 1]
+    )
+    resync = len(removed) > MAX_TOMBSTONES
+
+    position = (changes[-1].updated_at, changes[-1].id) if changes else (updated_at, order_id)
+    if not has_more:
+        # Pages still to come advance strictly so paging ends; the last one
+        # falls back to the horizon.
+        position = _settled(position)
+
+    return {
+        "orders": [serialize_order(o) for o in changes],
+        "removed": [] if resync else removed,
+        "resync": resync,
+        "sync_token": encode_cursor(*position),
+        "has_more": has_more,
+    }
@@ -0,0 +1,148 @@
+import math
+from collections import defaultdict
+from datetime import timedelta
+from django.utils import timezone
+from ..models import OrderStatusEvent, OrderItem, ArchivedOrder
+
+DEFAULT_WINDOW_MINUTES = 60
+MAX_WINDOW_MINUTES = 7 * 24 * 60
+
+
+def record_transition(order, previous_status):
+    """
+    Appends the change from `previous_status` to the order's current status.
+    Call after saving the order so updated_at is the transition time.
+    """
+    return OrderStatusEvent.objects.create(
+        restaurant_id=order.restaurant_id,
+        order_id=order.id,
+        from_status=previous_status,
+        to_status=order.status,
+        placed_at=order.created_at,
+        created_at=order.updated_at,
+    )
+
+
+def served_before(order_id) -> bool:
+    """
+    Whether the order has already been marked served at some point.
+    """
+    return OrderStatusEvent.objects.filter(order_id=order_id, to_status="served").exists()
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of `values`, or None when empty.
+    """
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+    }
+
+
+def order_dishes(order_ids):
+    """
+    {order_id: [(item_id, name), ...]} for live and archived orders.
+    """
+    dishes = defaultdict(list)
+
+    for order_id, item_id, name in OrderItem.objects.filter(
+        order_id__in=order_ids
+    ).values_list("order_id", "item_id", "item__name"):
+        dishes[order_id].append((item_id, name))
+
+    missing = set(order_ids) - set(dishes)
+
+    if missing:
+        for order_id, items in ArchivedOrder.objects.filter(
+            order_id__in=missing
+        ).values_list("order_id", "items"):
+            dishes[order_id] = [(line["item_id"], line["name"]) for line in items]
+
+    return dishes
+
+
+def kitchen_metrics(restaurant, minutes=DEFAULT_WINDOW_MINUTES):
+    """
+    p50/p95 prep time (placed -> ready) and serve time (ready -> served), in
+    seconds, for orders that reached those states in the last `minutes`,
+    overall and per dish.
+    """
+    since = timezone.now() - timedelta(minutes=minutes)
+
+    events = OrderStatusEvent.objects.filter(
+        restaurant=restaurant,
+        to_status__in=["ready", "served"],
+        created_at__gte=since
+    ).order_by("created_at", "id").values_list(
+        "order_id", "to_status", "placed_at", "created_at"
+    )
+
+    # The first time an order became ready in the window, and the last
+    # ready before it was served.
+    prep = {}
+    ready_at = {}
+    served_at = {}
+
+    for order_id, to_status, placed_at, created_at in events:
+        if to_status == "ready":
+            prep.setdefault(order_id, (created_at - placed_at).total_seconds())
+            ready_at[order_id] = created_at
+        else:
+            served_at.setdefault(order_id, created_at)
+
+    # Orders made ready before the window opened but served inside it.
+    earlier = set(served_at) - set(ready_at)
+
+    if earlier:
+        for order_id, created_at in OrderStatusEvent.objects.filter(
+            order_id__in=earlier,
+            to_status="ready",
+            created_at__lt=since
+        ).order_by("created_at", "id").values_list("order_id", "created_at"):
+            ready_at[order_id] = created_at
+
+    serve = {
+        order_id: (at - ready_at[order_id]).total_seconds()
+        for order_id, at in served_at.items()
+        if order_id in ready_at and ready_at[order_id] <= at
+    }
+
+    per_dish = defaultdict(lambda: {"name": "", "prep": [], "serve": []})
+
+    for order_id, items in order_dishes(list(prep.keys() | serve.keys())).items():
+        for item_id, name in items:
+            dish = per_dish[item_id]
+            dish["name"] = name
+            if order_id in prep:
+                dish["prep"].append(prep[order_id])
+            if order_id in serve:
+                dish["serve"].append(serve[order_id])
+
+    return {
+        "window_minutes": minutes,
+        "prep_seconds": summarize(list(prep.values())),
+        "serve_seconds": summarize(list(serve.values())),
+        "dishes": sorted(
+            (
+                {
+                    "item_id": item_id,
+                    "name": dish["name"],
+                    "prep_seconds": summarize(dish["prep"]),
+                    "serve_seconds": summarize(dish["serve"]),
+                }
+                for item_id, dish in per_dish.items()
+            ),
+            key=lambda d: d["prep_seconds"]["p95"] or 0,
+            reverse=True,
+        ),
+    }
@@ -0,0 +1,106 @@
+import bisect
+import threading
+
+# Upper bounds of the histogram buckets. Every series has a fixed number of
+# buckets and there is one series per URL pattern, so memory stays bounded
+# however many requests are served.
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+METRIC_PREFIX = "restaurant_http"
+
+HISTOGRAMS = {
+    "request_duration_seconds": ("Wall time per request", SECONDS_BUCKETS),
+    "db_queries": ("Database queries per request", QUERY_BUCKETS),
+    "db_duration_seconds": ("Time spent in database queries per request", SECONDS_BUCKETS),
+    "render_duration_seconds": ("Time spent rendering DRF responses", SECONDS_BUCKETS),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+class RequestMetrics:
+    """
+    Per-route request histograms, exported in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._responses = {}
+
+    def observe(self, method, route, status_code, sample: dict):
+        labels = (method, route)
+
+        with self._lock:
+            histograms = self._histograms.get(labels)
+            if histograms is None:
+                histograms = self._histograms[labels] = {
+                    name: Histogram(buckets)
+                    for name, (_, buckets) in HISTOGRAMS.items()
+                }
+
+            for name, value in sample.items():
+                histograms[name].observe(value)
+
+            key = (method, route, status_code)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._responses.clear()
+
+    def render(self) -> str:
+        lines = []
+
+        with self._lock:
+            name = f"{METRIC_PREFIX}_responses_total"
+            lines += [f"# HELP {name} Responses by status code", f"# TYPE {name} counter"]
+            for (method, route, status_code), count in sorted(self._responses.items()):
+                lines.append(
+                    f"{name}{{{_labels(method=method, route=route, status=status_code)}}} {count}"
+                )
+
+            for metric, (help_text, _) in HISTOGRAMS.items():
+                name = f"{METRIC_PREFIX}_{metric}"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+
+                for (method, route), histograms in sorted(self._histograms.items()):
+                    histogram = histograms[metric]
+                    labels = _labels(method=method, route=route)
+
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+request_metrics = RequestMetrics()
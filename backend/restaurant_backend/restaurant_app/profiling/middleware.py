@@ -0,0 +1,94 @@
+import time
+import logging
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from .metrics import request_metrics
+
+logger = logging.getLogger(__name__)
+
+# Statements kept per request for the slow-request log.
+MAX_LOGGED_QUERIES = 50
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper hook counting and timing queries on the
+    request's thread.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            took = time.perf_counter() - start
+            self.count += 1
+            self.seconds += took
+            if len(self.statements) < MAX_LOGGED_QUERIES:
+                self.statements.append((took, sql))
+
+
+class ProfilingMiddleware:
+    """
+    Records wall time, query count, query time and DRF render time for each
+    request into request_metrics, and logs requests slower than
+    PROFILING_SLOW_MS with their SQL. Only installed when PROFILING is on.
+
+    Queries are counted on the request thread, so async views (the order
+    stream) only contribute wall time.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_seconds = getattr(settings, "PROFILING_SLOW_MS", 500) / 1000
+
+    def __call__(self, request):
+        queries = QueryRecorder()
+        request._profiling_render = 0.0
+        start = time.perf_counter()
+
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+
+        elapsed = time.perf_counter() - start
+        match = request.resolver_match
+        route = match.route if match else "<unmatched>"
+
+        request_metrics.observe(request.method, route, response.status_code, {
+            "request_duration_seconds": elapsed,
+            "db_queries": queries.count,
+            "db_duration_seconds": queries.seconds,
+            "render_duration_seconds": request._profiling_render,
+        })
+
+        if elapsed >= self.slow_seconds:
+            logger.warning(
+                "Slow request %s %s: %.0fms, %d queries (%.0fms), render %.0fms\n%s",
+                request.method,
+                request.get_full_path(),
+                elapsed * 1000,
+                queries.count,
+                queries.seconds * 1000,
+                request._profiling_render * 1000,
+                "\n".join(f"  {took * 1000:.1f}ms {sql}" for took, sql in queries.statements),
+            )
+
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns.
+        start = time.perf_counter()
+
+        def rendered(_):
+            request._profiling_render = time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
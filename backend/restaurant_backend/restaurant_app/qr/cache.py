@@ -0,0 +1,91 @@
+import os
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from ..filecache import FileCache
+from .qrCode import qr_box_size, render_qr, size_svg
+
+# PNG encoding and file writes dominate; zlib and file I/O release the GIL,
+# so a small thread pool overlaps them without forking the worker.
+QR_RENDER_WORKERS = 4
+
+
+def _digest(link: str, fmt: str, scale) -> str:
+    return hashlib.sha256(f"{fmt}:{scale}:{link}".encode()).hexdigest()
+
+
+def qr_digest(link: str, fmt: str, size: int = None) -> str:
+    """
+    Hash of the image served for these arguments. PNG sizes that round to
+    the same pixels per module share a digest; SVGs differ only in their
+    width attribute.
+    """
+    scale = qr_box_size(link, size) if fmt == "png" else size
+    return _digest(link, fmt, scale)
+
+
+class QRCache(FileCache):
+    """
+    Two-level cache of rendered QR images keyed by a hash of their content.
+
+    Recently served images are kept in an in-memory LRU; everything else is
+    looked up on disk under QR_CACHE_DIR before being rendered, and the disk
+    cache drops its least recently used files past QR_CACHE_MAX_BYTES.
+
+    PNGs are stored once per pixels-per-module scale. SVGs are stored once
+    per link and sized on the way out, so arbitrary ?size= values cannot
+    fill the cache. Since the key covers the link, format and scale,
+    entries never need invalidating.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @property
+    def directory(self) -> str:
+        return str(settings.QR_CACHE_DIR)
+
+    @property
+    def max_bytes(self) -> int:
+        return getattr(settings, "QR_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+
+    def get(self, link: str, fmt: str, size: int = None) -> bytes:
+        if fmt == "svg":
+            data = self._load(link, fmt, _digest(link, fmt, None))
+            return size_svg(data, size) if size else data
+
+        return self._load(link, fmt, qr_digest(link, fmt, size), size)
+
+    def warm(self, links, fmt: str = "png", size: int = None):
+        with ThreadPoolExecutor(max_workers=QR_RENDER_WORKERS) as pool:
+            list(pool.map(lambda link: self.get(link, fmt, size), links))
+
+    def _load(self, link: str, fmt: str, digest: str, size: int = None) -> bytes:
+        with self._lock:
+            data = self._entries.get(digest)
+            if data is not None:
+                self._entries.move_to_end(digest)
+                return data
+
+        path = self._disk_path(digest, fmt)
+        data = self.read(path)
+
+        if data is None:
+            data = render_qr(link, fmt, size)
+            self.write(path, data)
+
+        with self._lock:
+            self._entries[digest] = data
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return data
+
+    def _disk_path(self, digest: str, fmt: str) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}.{fmt}")
+
+
+qr_cache = QRCache()
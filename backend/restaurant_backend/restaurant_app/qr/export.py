@@ -0,0 +1,94 @@
+import time
+import zipfile
+from django.utils.html import escape
+from .cache import qr_cache
+from .qrCode import table_qr_url
+
+SHEET_CODES_PER_PAGE = 12
+
+
+class _StreamBuffer:
+    """
+    Write-only file object for ZipFile. Having no tell()/seek() makes
+    zipfile use data descriptors, so the archive can be sent as it's built.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_qr_zip(restaurant, table_numbers, fmt: str = "png", size: int = None):
+    """
+    Yields a ZIP archive with one QR image per table, one table at a time,
+    so memory use does not grow with the number of tables.
+    """
+    buffer = _StreamBuffer()
+    date_time = time.localtime()[:6]
+
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for number in table_numbers:
+            data = qr_cache.get(
+                table_qr_url(restaurant.frontend_base_url, restaurant.id, number),
+                fmt,
+                size
+            )
+            # PNG is already deflated; storing avoids compressing it twice.
+            info = zipfile.ZipInfo(f"table_{number}.{fmt}", date_time)
+            archive.writestr(info, data, compress_type=zipfile.ZIP_STORED)
+            yield buffer.pop()
+
+    yield buffer.pop()
+
+
+def iter_qr_sheet(restaurant, table_numbers):
+    """
+    Yields a printable HTML page of SVG QR codes, SHEET_CODES_PER_PAGE to a
+    printed page.
+    """
+    name = escape(restaurant.name)
+
+    yield f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{name} - Table QR codes</title>
+<style>
+  body {{ font-family: sans-serif; margin: 0; }}
+  .page {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 8mm; padding: 10mm; page-break-after: always; }}
+  .code {{ text-align: center; }}
+  .code svg {{ width: 100%; height: auto; }}
+  .code p {{ margin: 2mm 0 0; font-weight: bold; }}
+</style>
+</head>
+<body>
+"""
+
+    count = 0
+    for number in table_numbers:
+        if count % SHEET_CODES_PER_PAGE == 0:
+            if count:
+                yield "</div>\n"
+            yield '<div class="page">\n'
+
+        svg = qr_cache.get(
+            table_qr_url(restaurant.frontend_base_url, restaurant.id, number),
+            "svg"
+        ).decode()
+        yield f'<div class="code">{svg}<p>{name} &middot; Table {number}</p></div>\n'
+        count += 1
+
+    if count:
+        yield "</div>\n"
+    yield "</body>\n</html>\n"
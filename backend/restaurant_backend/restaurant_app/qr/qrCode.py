@@ -1,30 +1,76 @@
-import os
+import io
+import re
+from functools import lru_cache
 import qrcode
 from qrcode.constants import ERROR_CORRECT_H
+from qrcode.image.svg import SvgPathImage
 from django.conf import settings
 
-def generate_qr(link: str, filename: str) -> str:
-    """
-    Generates a QR code for the given link and saves it.
-    Returns the relative path to the QR image.
-    """
+QR_FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+QR_BOX_SIZE = 10
+QR_BORDER = 4
 
+# SvgPathImage writes width/height in mm before its viewBox.
+SVG_SIZE = re.compile(rb'(<svg\b[^>]*?)width="[^"]*" height="[^"]*"')
+
+def _make_qr(link: str):
     qr = qrcode.QRCode(
         version=2,
         error_correction=ERROR_CORRECT_H,
-        box_size=10,
-        border=4,
+        box_size=QR_BOX_SIZE,
+        border=QR_BORDER,
     )
 
     qr.add_data(link)
     qr.make(fit=True)
+    return qr
 
-    img = qr.make_image(fill_color="black", back_color="white")
+@lru_cache(maxsize=4096)
+def _modules_count(link: str) -> int:
+    return _make_qr(link).modules_count
 
-    qr_dir = os.path.join(settings.MEDIA_ROOT, "qrcodes")
-    os.makedirs(qr_dir, exist_ok=True)
+def qr_box_size(link: str, size: int = None) -> int:
+    """
+    Pixels per module for a PNG about `size` pixels wide: the size rounded
+    down to a whole number of pixels per module.
+    """
+    if not size:
+        return QR_BOX_SIZE
+    return max(1, size // (_modules_count(link) + 2 * QR_BORDER))
 
-    file_path = os.path.join(qr_dir, f"{filename}.png")
-    img.save(file_path)
+def size_svg(data: bytes, size: int) -> bytes:
+    """
+    Sets an SVG's display width and height to `size` pixels. The viewBox
+    is in modules, so the image scales without re-rendering.
+    """
+    return SVG_SIZE.sub(
+        rb'\1width="%d" height="%d"' % (size, size),
+        data,
+        count=1,
+    )
+
+def render_qr(link: str, fmt: str = "png", size: int = None) -> bytes:
+    """
+    Renders a QR code for the given link and returns the encoded image.
+    `size` is the target width in pixels (see qr_box_size for PNGs).
+    """
+
+    qr = _make_qr(link)
+
+    if fmt == "svg":
+        data = qr.make_image(image_factory=SvgPathImage).to_string()
+        return size_svg(data, size) if size else data
+
+    qr.box_size = qr_box_size(link, size)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
 
-    return f"qrcodes/{filename}.png"
+def table_qr_url(frontend_base_url: str, restaurant_id: int, table_number: int) -> str:
+    base = (frontend_base_url or settings.FRONTEND_BASE_URL).rstrip("/")
+    return f"{base}/customer/order/{restaurant_id}/{table_number}/"
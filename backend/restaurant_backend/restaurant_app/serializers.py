@@ -57,7 +57,7 @@ class MenuImageSerializer(serializers.ModelSerializer):
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
-    dish_name = serializers.ReadOnlyField(source="dish.name")
+    dish_name = serializers.ReadOnlyField(source="item.name")
 
     class Meta:
         model = OrderItem
@@ -73,10 +73,7 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
     def get_total_price(self, obj):
-        return sum(
-            item.quantity * item.price
-            for item in obj.items.all()
-        )
+        return obj.total
 
 class AdminSignupSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Restaurant, MenuCategory, MenuItem
+from .menu.cache import bump_menu_version
+
+
+def _bump_on_commit(restaurant_id):
+    # A version bumped before the commit could be re-cached with the old
+    # rows by a request that reads them in between.
+    transaction.on_commit(lambda: bump_menu_version(restaurant_id))
+
+
+def _cascaded_from(kwargs, *models) -> bool:
+    """
+    True when a post_delete comes from deleting one of `models`, whose own
+    receiver bumps the version once for the whole cascade.
+    """
+    origin = kwargs.get("origin")
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in models
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+def restaurant_changed(sender, instance, **kwargs):
+    _bump_on_commit(instance.id)
+
+
+@receiver([post_save, post_delete], sender=MenuCategory)
+def category_changed(sender, instance, **kwargs):
+    if _cascaded_from(kwargs, Restaurant):
+        return
+
+    _bump_on_commit(instance.restaurant_id)
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+def menu_item_changed(sender, instance, **kwargs):
+    if _cascaded_from(kwargs, Restaurant, MenuCategory):
+        return
+
+    restaurant_id = MenuCategory.objects.filter(
+        id=instance.category_id
+    ).values_list("restaurant_id", flat=True).first()
+
+    if restaurant_id is not None:
+        _bump_on_commit(restaurant_id)
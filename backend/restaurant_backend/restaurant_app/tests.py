@@ -1,3 +1,1337 @@
-from django.test import TestCase
+import io
+import os
+import json
+import asyncio
+import math
+import time
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+from django.apps import apps
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, AsyncClient, Client, override_settings
+from PIL import Image, ImageDraw
+from django.utils import timezone
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from .profiling.metrics import request_metrics
+from .events.broker import broker
+from .qr.cache import QRCache
+from .orders.archive import archive_order
+from .events.watch import OrderWatcher
+from .menu.cache import get_menu_version
+from .menu.importer import IMPORT_BATCH_SIZE
+from .ocr.preprocess import max_side_for, preprocess, skew_angle
+from .ocr.cache import ResultCache, ocr_cache
+from .ocr.pipeline import (
+    build_messages, llm_batches, llm_cache_key, ocr_cache_key, parse_menu_text, pipeline,
+)
+from .ocr.llm import LocalBackend
+from .ocr.layout import parse_layout
+from .ocr.schema import MenuSchemaError, MenuStreamParser, parse_menu_reply
+from .ocr.registry import ModelRegistry, registry
+from .models import (
+    Restaurant,
+    MenuCategory,
+    MenuItem,
+    Table,
+    Order,
+    OrderItem,
+    ArchivedOrder,
+    DailySales,
+    DailyDishSales,
+    OrderStatusEvent,
+)
+
+
+class OwnerTestCase(TestCase):
+    """
+    A "Test Kitchen" restaurant with `tables` tables, owned by `owner`.
+    `self.auth` holds the owner's Bearer header.
+    """
+    tables = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner", "owner@example.com", "password")
+        cls.restaurant = Restaurant.objects.create(
+            owner=cls.owner,
+            name="Test Kitchen",
+            address="1 Test Street",
+        )
+        Table.objects.bulk_create([
+            Table(restaurant=cls.restaurant, table_number=number, qr_token=f"t{number}")
+            for number in range(1, cls.tables + 1)
+        ])
+
+    def setUp(self):
+        # Restaurant ids are reused between tests, so cached menus must not be.
+        cache.clear()
+        self.auth = self.bearer(self.owner)
+
+    def bearer(self, user):
+        return {"Authorization": f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+
+class PlaceOrderTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        category = MenuCategory.objects.create(restaurant=cls.restaurant, name="Mains")
+        cls.items = [
+            MenuItem.objects.create(category=category, name=f"Dish {i}", price=100 + i)
+            for i in range(10)
+        ]
+        cls.url = f"/placeorder/{cls.restaurant.id}/1/"
+
+    def place(self, items):
+        return self.client.post(self.url, {"items": items}, content_type="application/json")
+
+    def test_query_count_is_independent_of_order_size(self):
+        items = [{"item_id": item.id, "quantity": 2} for item in self.items]
+
+        # table+restaurant, menu items, savepoint, order, order items,
+        # daily counters, dish counters, release
+        with self.assertNumQueries(8):
+            response = self.place(items)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(OrderItem.objects.filter(order_id=response.json()["order_id"]).count(), 10)
+
+    def test_duplicate_items_are_merged(self):
+        item = self.items[0]
+        response = self.place([
+            {"item_id": item.id, "quantity": 1},
+            {"item_id": item.id, "quantity": 2},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        line = OrderItem.objects.get(order_id=response.json()["order_id"])
+        self.assertEqual(line.quantity, 3)
+
+    def test_unavailable_item_rejects_whole_order(self):
+        unavailable = self.items[1]
+        unavailable.is_available = False
+        unavailable.save()
+
+        response = self.place([
+            {"item_id": self.items[0].id, "quantity": 1},
+            {"item_id": unavailable.id, "quantity": 1},
+        ])
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Order.objects.exists())
+
+    def test_invalid_quantity_is_rejected(self):
+        response = self.place([{"item_id": self.items[0].id, "quantity": 0}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_booleans_are_not_numbers(self):
+        for line in (
+            {"item_id": self.items[0].id, "quantity": True},
+            {"item_id": True, "quantity": 1},
+        ):
+            response = self.place([line])
+            self.assertEqual(response.status_code, 400)
+
+        self.assertFalse(Order.objects.exists())
+
+    def test_price_edits_do_not_change_placed_orders(self):
+        item = self.items[0]
+        response = self.place([{"item_id": item.id, "quantity": 2}])
+        order_id = response.json()["order_id"]
+
+        item.price = 999
+        item.save()
+
+        data = self.client.get(f"/orders/{order_id}/").json()
+        self.assertEqual(data["total"], 200.0)
+        self.assertEqual(data["items"][0]["price"], 100.0)
+
+
+class OwnerMetricsTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        category = MenuCategory.objects.create(restaurant=cls.restaurant, name="Mains")
+        cls.soup = MenuItem.objects.create(category=category, name="Soup", price=50)
+        cls.curry = MenuItem.objects.create(category=category, name="Curry", price=200)
+
+    def place(self, items):
+        response = self.client.post(
+            f"/placeorder/{self.restaurant.id}/1/",
+            {"items": items},
+            content_type="application/json",
+        )
+        return response.json()["order_id"]
+
+    def serve(self, order_id, new_status="served"):
+        self.client.patch(
+            f"/updateorder/{order_id}/",
+            {"status": new_status},
+            content_type="application/json",
+            headers=self.auth,
+        )
+
+    def report(self):
+        return self.client.get(
+            f"/analytics/{self.restaurant.id}/?days=7",
+            headers=self.auth,
+        ).json()
+
+    def test_counters_follow_orders(self):
+        first = self.place([{"item_id": self.soup.id, "quantity": 2}])
+        self.place([
+            {"item_id": self.soup.id, "quantity": 1},
+            {"item_id": self.curry.id, "quantity": 1},
+        ])
+        self.serve(first)
+        self.serve(first)
+
+        report = self.report()
+
+        self.assertEqual(report["orders"], 2)
+        self.assertEqual(float(report["revenue"]), 350.0)
+        self.assertEqual(len(report["days"]), 7)
+        self.assertIsNotNone(report["avg_ticket_seconds"])
+        self.assertEqual(DailySales.objects.get().served, 1)
+        self.assertEqual(
+            [(d["name"], d["quantity"]) for d in report["top_dishes"]],
+            [("Soup", 3), ("Curry", 1)],
+        )
+
+    def test_backfill_matches_incremental_counters(self):
+        first = self.place([{"item_id": self.soup.id, "quantity": 2}])
+        self.place([{"item_id": self.curry.id, "quantity": 3}])
+        self.serve(first)
+
+        def snapshot():
+            return (
+                list(DailySales.objects.values_list("date", "orders", "revenue", "served")),
+                sorted(DailyDishSales.objects.values_list("item_id", "quantity", "revenue")),
+            )
+
+        incremental = snapshot()
+        DailySales.objects.all().delete()
+        DailyDishSales.objects.all().delete()
+        out = io.StringIO()
+        call_command("backfill_sales", stdout=out)
+
+        self.assertIn("Wrote 1 daily sales rows", out.getvalue())
+        self.assertEqual(snapshot(), incremental)
+
+    def test_serving_again_is_counted_once(self):
+        order_id = self.place([{"item_id": self.soup.id, "quantity": 1}])
+        self.serve(order_id)
+        served = DailySales.objects.values_list("served", "ticket_seconds").get()
+
+        self.serve(order_id, "preparing")
+        self.serve(order_id)
+
+        self.assertEqual(DailySales.objects.values_list("served", "ticket_seconds").get(), served)
+
+        out = io.StringIO()
+        call_command("backfill_sales", stdout=out)
+        self.assertIn("Wrote 1 daily sales rows", out.getvalue())
+        self.assertEqual(DailySales.objects.values_list("served", "ticket_seconds").get(), served)
+
+    def test_backfill_keeps_deleted_dishes_apart(self):
+        self.place([
+            {"item_id": self.soup.id, "quantity": 2},
+            {"item_id": self.curry.id, "quantity": 1},
+        ])
+        Order.objects.update(status="served")
+        call_command("archive_orders", "--hours", "0", stdout=io.StringIO())
+        MenuItem.objects.filter(id__in=[self.soup.id, self.curry.id]).delete()
+
+        out = io.StringIO()
+        call_command("backfill_sales", stdout=out)
+
+        self.assertIn("Wrote 1 daily sales rows", out.getvalue())
+        self.assertEqual(
+            sorted(DailyDishSales.objects.values_list("item_id", "name", "quantity")),
+            [(None, "Curry", 1), (None, "Soup", 2)],
+        )
+
+    def test_report_is_owner_only(self):
+        other = User.objects.create_user("other", "other@example.com", "password")
+
+        response = self.client.get(
+            f"/analytics/{self.restaurant.id}/",
+            headers=self.bearer(other),
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_status_changes_are_logged(self):
+        order_id = self.place([{"item_id": self.soup.id, "quantity": 1}])
+        for new_status in ["preparing", "preparing", "ready", "served"]:
+            self.serve(order_id, new_status)
+
+        self.assertEqual(
+            list(OrderStatusEvent.objects.filter(order_id=order_id)
+                 .order_by("id").values_list("from_status", "to_status")),
+            [("pending", "preparing"), ("preparing", "ready"), ("ready", "served")],
+        )
+
+    def test_kitchen_latency_percentiles(self):
+        now = timezone.now()
+        order_ids = [
+            self.place([{"item_id": self.curry.id if i < 2 else self.soup.id, "quantity": 1}])
+            for i in range(4)
+        ]
+
+        # Prep takes 60, 120, 180, 240s; serving takes 30s each.
+        for i, order_id in enumerate(order_ids):
+            placed_at = now - timedelta(minutes=30)
+            ready_at = placed_at + timedelta(seconds=60 * (i + 1))
+            for to_status, at in [("ready", ready_at), ("served", ready_at + timedelta(seconds=30))]:
+                OrderStatusEvent.objects.create(
+                    restaurant=self.restaurant,
+                    order_id=order_id,
+                    from_status="",
+                    to_status=to_status,
+                    placed_at=placed_at,
+                    created_at=at,
+                )
+
+        data = self.client.get(
+            f"/analytics/{self.restaurant.id}/kitchen/?minutes=60",
+            headers=self.auth,
+        ).json()
+
+        self.assertEqual(data["prep_seconds"], {"count": 4, "p50": 120.0, "p95": 240.0})
+        self.assertEqual(data["serve_seconds"]["p95"], 30.0)
+        self.assertEqual(
+            [(d["name"], d["prep_seconds"]["p95"]) for d in data["dishes"]],
+            [("Soup", 240.0), ("Curry", 120.0)],
+        )
+
+        narrow = self.client.get(
+            f"/analytics/{self.restaurant.id}/kitchen/?minutes=1",
+            headers=self.auth,
+        ).json()
+        self.assertEqual(narrow["prep_seconds"]["count"], 0)
+
+
+class OrderStatusTests(OwnerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.order = Order.objects.create(restaurant=self.restaurant, table=Table.objects.get())
+        self.url = f"/orders/{self.order.id}/"
+
+    def test_unchanged_status_is_not_sent_again(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        # Only the status lookup runs for a revalidation.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.order.status = "preparing"
+        self.order.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "preparing")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_long_poll_times_out_with_304(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        start = time.monotonic()
+        response = self.client.get(self.url, {"wait": "0.1"}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    def test_long_poll_returns_once_the_status_changes(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        def status_changes(order_id, timeout):
+            Order.objects.filter(id=order_id).update(status="ready")
+            return True
+
+        with mock.patch("restaurant_app.views.order_watcher.wait", side_effect=status_changes) as wait:
+            response = self.client.get(self.url, {"wait": "20"}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "ready")
+        wait.assert_called_once()
+
+    def test_status_update_wakes_waiters(self):
+        with mock.patch("restaurant_app.views.order_watcher.notify") as notify:
+            response = self.client.patch(
+                f"/updateorder/{self.order.id}/",
+                {"status": "preparing"},
+                content_type="application/json",
+                headers=self.auth,
+            )
+
+        self.assertEqual(response.status_code, 200)
+        notify.assert_called_once_with(self.order.id)
+
+    def test_watcher_wakes_a_waiting_thread(self):
+        watcher = OrderWatcher()
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            woken = pool.submit(watcher.wait, 1, 5)
+            while not watcher._waiters:
+                time.sleep(0.01)
+            watcher.notify(1)
+
+            self.assertTrue(woken.result(timeout=5))
+        self.assertEqual(watcher._waiters, {})
+
+
+class OrderBoardTests(OwnerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = f"/board/{self.restaurant.id}/"
+
+    def order(self, age, **fields):
+        order = Order.objects.create(restaurant=self.restaurant, **fields)
+        stamp = timezone.now() - timedelta(seconds=age)
+        Order.objects.filter(id=order.id).update(created_at=stamp, updated_at=stamp)
+        return order
+
+    def board(self, **params):
+        response = self.client.get(self.url, params, headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_return_every_order_once(self):
+        orders = [self.order(3600) for _ in range(5)]
+        Order.objects.update(created_at=timezone.now() - timedelta(hours=1))
+
+        seen = []
+        page = self.board(limit=2)
+        while True:
+            seen += [o["order_id"] for o in page["orders"]]
+            if not page["next_cursor"]:
+                break
+            page = self.board(limit=2, cursor=page["next_cursor"])
+
+        self.assertEqual(seen, [o.id for o in reversed(orders)])
+
+    def test_since_returns_changed_orders(self):
+        changed = self.order(3600)
+        self.order(3600)
+        token = self.board()["sync_token"]
+
+        self.assertEqual(self.board(since=token)["orders"], [])
+
+        Order.objects.filter(id=changed.id).update(
+            status="preparing",
+            updated_at=timezone.now() - timedelta(minutes=1),
+        )
+        changes = self.board(since=token)
+
+        self.assertEqual([o["order_id"] for o in changes["orders"]], [changed.id])
+        self.assertEqual(changes["orders"][0]["status"], "preparing")
+        self.assertEqual(self.board(since=changes["sync_token"])["orders"], [])
+
+    def test_late_commits_are_not_skipped(self):
+        token = self.board()["sync_token"]
+        fast = self.order(1)
+        self.assertEqual([o["order_id"] for o in self.board(since=token)["orders"]], [fast.id])
+        token = self.board(since=token)["sync_token"]
+
+        # Stamped before `fast` but committed after the sync above.
+        slow = self.order(3)
+
+        changes = self.board(since=token)
+        self.assertEqual([o["order_id"] for o in changes["orders"]], [slow.id, fast.id])
+
+    def test_archived_orders_are_reported_as_removed(self):
+        order = self.order(3600, status="served")
+        token = self.board()["sync_token"]
+
+        order_id = order.id
+        archive_order(order).save()
+        order.delete()
+
+        changes = self.board(since=token)
+        self.assertEqual(changes["removed"], [order_id])
+        self.assertFalse(changes["resync"])
+
+        with mock.patch("restaurant_app.orders.board.MAX_TOMBSTONES", 0):
+            changes = self.board(since=token)
+        self.assertEqual(changes["removed"], [])
+        self.assertTrue(changes["resync"])
+
+    def test_invalid_cursors_are_rejected(self):
+        for param in ("cursor", "since"):
+            response = self.client.get(self.url, {param: "not-a-cursor"}, headers=self.auth)
+            self.assertEqual(response.status_code, 400)
+
+
+class ArchiveTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        category = MenuCategory.objects.create(restaurant=cls.restaurant, name="Mains")
+        cls.curry = MenuItem.objects.create(category=category, name="Curry", price=120)
+
+    def order(self, status, hours):
+        order = Order.objects.create(
+            restaurant=self.restaurant,
+            table=Table.objects.get(),
+            status=status,
+            total=240,
+        )
+        OrderItem.objects.create(order=order, item=self.curry, quantity=2, unit_price=120)
+        Order.objects.filter(id=order.id).update(
+            updated_at=timezone.now() - timedelta(hours=hours)
+        )
+        return order
+
+    def test_only_old_served_orders_are_archived(self):
+        old = [self.order("served", 48) for _ in range(3)]
+        recent = self.order("served", 1)
+        waiting = self.order("pending", 48)
+
+        out = io.StringIO()
+        call_command("archive_orders", "--hours", "24", "--batch-size", "2", stdout=out)
+
+        self.assertIn("Archived 3 orders", out.getvalue())
+        self.assertEqual(
+            sorted(Order.objects.values_list("id", flat=True)),
+            [recent.id, waiting.id],
+        )
+        self.assertEqual(
+            sorted(ArchivedOrder.objects.values_list("order_id", flat=True)),
+            [o.id for o in old],
+        )
+        self.assertFalse(OrderItem.objects.filter(order_id__in=[o.id for o in old]).exists())
+
+    def test_archived_lines_survive_menu_edits(self):
+        order = self.order("served", 48)
+        call_command("archive_orders", stdout=io.StringIO())
+
+        self.curry.name = "Chicken Curry"
+        self.curry.price = 150
+        self.curry.save()
+
+        archived = ArchivedOrder.objects.get(order_id=order.id)
+        self.assertEqual(archived.table_number, 1)
+        self.assertEqual(archived.total, 240)
+        self.assertEqual(
+            archived.items,
+            [{"item_id": self.curry.id, "name": "Curry", "quantity": 2, "unit_price": "120.00"}],
+        )
+
+        # Running again finds nothing left to move.
+        out = io.StringIO()
+        call_command("archive_orders", stdout=out)
+        self.assertIn("Archived 0 orders", out.getvalue())
+
+
+class OrderStreamTests(OwnerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = f"/currentorders/{self.restaurant.id}/stream/"
+        self.token = str(RefreshToken.for_user(self.owner).access_token)
+
+    async def test_stream_delivers_order_events(self):
+        response = await AsyncClient().get(self.url, {"token": self.token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        events = response.streaming_content
+        try:
+            self.assertEqual(await anext(events), b"retry: 3000\n\n")
+
+            broker.publish(self.restaurant.id, {"type": "order.created", "order": {"order_id": 7}})
+            event = await asyncio.wait_for(anext(events), timeout=5)
+        finally:
+            await events.aclose()
+
+        self.assertEqual(
+            event,
+            b'event: order.created\ndata: {"type": "order.created", "order": {"order_id": 7}}\n\n'
+        )
+
+    async def test_stream_needs_a_valid_token(self):
+        response = await AsyncClient().get(self.url, {"token": "nope"})
+        self.assertEqual(response.status_code, 401)
+
+    def test_wsgi_server_is_told_to_poll(self):
+        response = self.client.get(self.url, {"token": self.token})
+        self.assertEqual(response.status_code, 503)
+
+
+@override_settings(PROFILING=True, PROFILING_SLOW_MS=60_000)
+class ProfilingTests(OwnerTestCase):
+    def setUp(self):
+        super().setUp()
+        request_metrics.reset()
+        # The middleware decides whether it is enabled when the handler loads.
+        self.client = Client()
+
+    def test_requests_are_exported_per_route(self):
+        with (
+            self.settings(PROFILING_SLOW_MS=0),
+            self.assertLogs("restaurant_app.profiling.middleware", "WARNING") as logs,
+        ):
+            Client().get(f"/info/{self.restaurant.id}/")
+
+        self.assertIn("SELECT", logs.output[0])
+
+        body = self.client.get("/metrics").content.decode()
+
+        self.assertIn(
+            'restaurant_http_responses_total{method="GET",route="info/<int:restaurant_id>/",status="200"} 1',
+            body,
+        )
+        self.assertIn(
+            'restaurant_http_db_queries_count{method="GET",route="info/<int:restaurant_id>/"} 1',
+            body,
+        )
+
+    def test_metrics_are_local_only(self):
+        response = self.client.get("/metrics", REMOTE_ADDR="10.0.0.5")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_metrics_are_reachable_over_loopback(self):
+        for host in ("127.0.0.1:8000", "localhost", "[::1]:8000"):
+            response = self.client.get("/metrics", HTTP_HOST=host)
+            self.assertEqual(response.status_code, 200, host)
+
+        response = self.client.get("/metrics", HTTP_HOST="evil.example.com")
+        self.assertEqual(response.status_code, 400)
+
+    def test_metrics_token_is_required_when_set(self):
+        with self.settings(METRICS_TOKEN="scrape-me"):
+            self.assertEqual(self.client.get("/metrics").status_code, 404)
+            self.assertEqual(
+                self.client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code,
+                404,
+            )
+            self.assertEqual(
+                self.client.get("/metrics", headers={"Authorization": "Bearer scrape-me"}).status_code,
+                200,
+            )
+
+
+class MenuCacheTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.category = MenuCategory.objects.create(restaurant=cls.restaurant, name="Soups")
+        MenuItem.objects.bulk_create([
+            MenuItem(category=cls.category, name=name, price=50)
+            for name in ("Tomato", "Onion", "Lentil")
+        ])
+        cls.url = f"/info/{cls.restaurant.id}/"
+
+    def test_menu_is_served_from_the_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.json()["menu"][0]["items"]), 3)
+
+        with self.assertNumQueries(0):
+            repeat = self.client.get(self.url)
+            revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(repeat.content, first.content)
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_edits_invalidate_the_menu_after_commit(self):
+        etag = self.client.get(self.url)["ETag"]
+        version = get_menu_version(self.restaurant.id)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            MenuItem.objects.create(category=self.category, name="Pumpkin", price=60)
+
+        self.assertEqual(get_menu_version(self.restaurant.id), version)
+        self.assertEqual(len(callbacks), 1)
+
+        callbacks[0]()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Pumpkin", [item["name"] for item in response.json()["menu"][0]["items"]])
+
+    def test_cascading_deletes_bump_once(self):
+        restaurant_id = self.restaurant.id
+        mains = MenuCategory.objects.create(restaurant=self.restaurant, name="Mains")
+        MenuItem.objects.create(category=mains, name="Curry", price=120)
+        MenuItem.objects.create(category=mains, name="Rice", price=80)
+
+        # A category with its items, then the restaurant with what is left.
+        for deleted in (mains, self.restaurant):
+            with (
+                mock.patch("restaurant_app.signals.bump_menu_version") as bump,
+                self.captureOnCommitCallbacks(execute=True),
+            ):
+                deleted.delete()
+
+            bump.assert_called_once_with(restaurant_id)
+
+
+class QRCodeTests(OwnerTestCase):
+    tables = 3
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_dir = directory.name
+        self.enterContext(self.settings(QR_CACHE_DIR=self.cache_dir))
+        self.qr_cache = self.enterContext(mock.patch("restaurant_app.views.qr_cache", QRCache()))
+
+    def cached_files(self):
+        return sorted(
+            name
+            for _, _, names in os.walk(self.cache_dir)
+            for name in names
+        )
+
+    def test_registration_creates_every_table(self):
+        response = self.client.post(
+            "/register/",
+            {
+                "restaurant_name": "Second Kitchen",
+                "restaurant_address": "2 Test Street",
+                "restaurant_tables": 5,
+                "restaurant_menu": json.dumps([{"category": "Mains", "name": "Curry", "price": 200}]),
+            },
+            headers=self.auth,
+        )
+
+        self.assertEqual(response.status_code, 201)
+        tables = Table.objects.filter(restaurant_id=response.json()["restaurant_id"])
+        self.assertEqual(
+            sorted(tables.values_list("table_number", flat=True)),
+            [1, 2, 3, 4, 5],
+        )
+        self.assertEqual(len(set(tables.values_list("qr_token", flat=True))), 5)
+
+    def test_regenerate_renders_every_table_ahead_of_time(self):
+        response = self.client.post(
+            f"/qr/{self.restaurant.id}/regenerate/",
+            {"frontend_base_url": "https://menu.example.com/"},
+            content_type="application/json",
+            headers=self.auth,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["tables"], 3)
+        self.assertEqual(len(self.cached_files()), 3)
+
+        with mock.patch("restaurant_app.qr.cache.render_qr") as render:
+            response = self.client.get(f"/qr/{self.restaurant.id}/2.png")
+
+        self.assertEqual(response.status_code, 200)
+        render.assert_not_called()
+
+    def test_sizes_share_rendered_images(self):
+        url = f"/qr/{self.restaurant.id}/1"
+        etags = set()
+
+        for size in range(64, 104):
+            for fmt in ("png", "svg"):
+                response = self.client.get(f"{url}.{fmt}", {"size": size})
+                self.assertEqual(response.status_code, 200)
+                etags.add(response["ETag"])
+
+        # 40 sizes round to two PNG scales, and SVGs are stored unsized.
+        self.assertEqual(len(self.cached_files()), 3)
+        self.assertEqual(len(etags), 42)
+
+    def test_svg_is_sized_in_pixels(self):
+        response = self.client.get(f"/qr/{self.restaurant.id}/1.svg", {"size": 300})
+
+        svg = response.content.decode()
+        self.assertTrue(svg.startswith('<svg width="300" height="300" '))
+        self.assertIn('viewBox="0 0 ', svg)
+
+    def test_disk_cache_is_bounded(self):
+        cache = QRCache(max_entries=0)
+
+        with self.settings(QR_CACHE_MAX_BYTES=20_000):
+            for number in range(40):
+                cache.get(f"https://example.com/customer/order/1/{number}/", "png", 512)
+
+            entries, size = cache.usage()
+
+        self.assertLess(entries, 40)
+        self.assertLessEqual(size, 20_000)
+        self.assertEqual(len(self.cached_files()), entries)
+
+    def test_zip_export_has_one_image_per_table(self):
+        response = self.client.get(f"/qr/{self.restaurant.id}/export.zip", headers=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(), ["table_1.png", "table_2.png", "table_3.png"])
+        self.assertTrue(archive.read("table_1.png").startswith(b"\x89PNG"))
+
+        response = self.client.get(
+            f"/qr/{self.restaurant.id}/export.zip",
+            {"image": "svg", "size": 200},
+            headers=self.auth,
+        )
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertTrue(archive.read("table_3.svg").startswith(b'<svg width="200" height="200" '))
+
+    def test_sheet_pages_every_table(self):
+        Table.objects.bulk_create([
+            Table(restaurant=self.restaurant, table_number=number, qr_token=f"t{number}")
+            for number in range(4, 14)
+        ])
+
+        response = self.client.get(f"/qr/{self.restaurant.id}/sheet.html", headers=self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        html = b"".join(response.streaming_content).decode()
+        self.assertEqual(html.count("<svg"), 13)
+        self.assertEqual(html.count('<div class="page">'), 2)
+        self.assertIn("Test Kitchen &middot; Table 13", html)
+
+    def test_exports_are_owner_only(self):
+        stranger = User.objects.create_user("stranger", "s@example.com", "password")
+
+        for export in ("export.zip", "sheet.html"):
+            response = self.client.get(
+                f"/qr/{self.restaurant.id}/{export}",
+                headers=self.bearer(stranger),
+            )
+            self.assertEqual(response.status_code, 404)
+
+    def test_regenerate_is_owner_only(self):
+        stranger = User.objects.create_user("stranger", "s@example.com", "password")
+        response = self.client.post(
+            f"/qr/{self.restaurant.id}/regenerate/",
+            headers=self.bearer(stranger),
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.cached_files(), [])
+
+
+class MenuImportTests(OwnerTestCase):
+    def register(self, menu):
+        return self.client.post(
+            "/register/",
+            {
+                "restaurant_name": "Test Kitchen",
+                "restaurant_address": "1 Test Street",
+                "restaurant_tables": 4,
+                "restaurant_menu": json.dumps(menu),
+            },
+            headers=self.auth,
+        )
+
+    def test_invalid_rows_are_all_reported_before_writing(self):
+        response = self.register([
+            {"category": "Mains", "name": "Curry", "price": 200},
+            {"category": "", "name": "Soup", "price": 50},
+            {"category": "Mains", "name": "Rice", "price": "free"},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [(e["row"], e["field"]) for e in response.json()["details"]],
+            [(2, "category"), (3, "price")],
+        )
+        self.assertEqual(Restaurant.objects.count(), 1)
+
+    def test_large_csv_import_uses_bulk_queries(self):
+        response = self.register([{"category": "Mains", "name": "Curry", "price": 200}])
+        restaurant_id = response.json()["restaurant_id"]
+
+        rows = ["category,name,description,price,veg"] + [
+            f"Category {i % 20},Dish {i},,{100 + i},{'yes' if i % 2 else 'no'}"
+            for i in range(3000)
+        ]
+        upload = SimpleUploadedFile("menu.csv", "\n".join(rows).encode(), "text/csv")
+
+        # SQLite caps the parameters per statement, so it needs more batches.
+        fields = [f for f in MenuItem._meta.concrete_fields if not f.primary_key]
+        batch = min(IMPORT_BATCH_SIZE, connection.ops.bulk_batch_size(fields, rows) or IMPORT_BATCH_SIZE)
+
+        # user, restaurant, savepoint, categories, new categories,
+        # existing items, item batches, release
+        with self.assertNumQueries(7 + math.ceil(3000 / batch)):
+            response = self.client.post(
+                f"/menu/{restaurant_id}/import/",
+                {"file": upload},
+                headers=self.auth,
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {
+            "categories_created": 20,
+            "items_created": 3000,
+            "items_updated": 0,
+        })
+        self.assertEqual(MenuItem.objects.filter(category__restaurant_id=restaurant_id).count(), 3001)
+
+    def test_reimport_updates_existing_items(self):
+        restaurant_id = self.register([
+            {"category": "Mains", "name": "Curry", "price": 200},
+        ]).json()["restaurant_id"]
+
+        response = self.client.post(
+            f"/menu/{restaurant_id}/import/",
+            {"menu": [{"category": "Mains", "dishes": [
+                {"name": "Curry", "price": 250},
+                {"name": "Rice", "price": 80},
+            ]}]},
+            content_type="application/json",
+            headers=self.auth,
+        )
+
+        self.assertEqual(response.json(), {
+            "categories_created": 0,
+            "items_created": 1,
+            "items_updated": 1,
+        })
+        self.assertEqual(MenuItem.objects.get(name="Curry").price, 250)
+
+
+class MenuEditTests(OwnerTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.mains = MenuCategory.objects.create(restaurant=cls.restaurant, name="Mains", order=0)
+        cls.drinks = MenuCategory.objects.create(restaurant=cls.restaurant, name="Drinks", order=1)
+        cls.curry = MenuItem.objects.create(category=cls.mains, name="Curry", price=200)
+        cls.rice = MenuItem.objects.create(category=cls.mains, name="Rice", price=80)
+
+    def patch(self, body):
+        return self.client.patch(
+            f"/menu/{self.restaurant.id}/",
+            body,
+            content_type="application/json",
+            headers=self.auth,
+        )
+
+    def test_86_a_dish_is_a_single_update(self):
+        # user, restaurant, savepoint, update, release
+        with self.assertNumQueries(5):
+            response = self.patch({"items": [{"id": self.curry.id, "available": False}]})
+
+        self.assertEqual(response.status_code, 200)
+        self.curry.refresh_from_db()
+        self.assertFalse(self.curry.is_available)
+
+    def test_only_changed_rows_are_written(self):
+        response = self.patch({
+            "items": [
+                {"id": self.curry.id, "price": "200.00"},
+                {"id": self.rice.id, "price": 90, "available": False},
+            ],
+            "categories": [
+                {"id": self.mains.id, "order": 1},
+                {"id": self.drinks.id, "order": 0},
+            ],
+        })
+
+        self.assertEqual(response.json()["items_updated"], 1)
+        self.assertEqual(response.json()["categories_updated"], 2)
+        self.rice.refresh_from_db()
+        self.assertEqual((self.rice.price, self.rice.is_available), (90, False))
+        self.assertEqual(
+            list(MenuCategory.objects.filter(restaurant=self.restaurant).values_list("name", flat=True)),
+            ["Drinks", "Mains"],
+        )
+
+    def test_unknown_item_rolls_back_the_batch(self):
+        other_owner = User.objects.create_user("other", "other@example.com", "password")
+        other = Restaurant.objects.create(owner=other_owner, name="Other", address="-")
+        category = MenuCategory.objects.create(restaurant=other, name="Mains")
+        foreign = MenuItem.objects.create(category=category, name="Soup", price=50)
+
+        response = self.patch({"items": [
+            {"id": self.curry.id, "price": 10},
+            {"id": foreign.id, "price": 10},
+        ]})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["ids"], [foreign.id])
+        self.curry.refresh_from_db()
+        self.assertEqual(self.curry.price, 200)
+
+    def test_unknown_item_is_reported_when_86ing(self):
+        missing = self.rice.id + 1000
+
+        response = self.patch({"items": [
+            {"id": self.curry.id, "available": False},
+            {"id": missing, "available": False},
+        ]})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["ids"], [missing])
+        self.curry.refresh_from_db()
+        self.assertTrue(self.curry.is_available)
+
+    def test_invalid_values_are_reported(self):
+        response = self.patch({"items": [{"id": self.curry.id, "price": -1, "colour": "red"}]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [e["field"] for e in response.json()["details"]],
+            ["price", "colour"],
+        )
+
+
+class ModelRegistryTests(OwnerTestCase):
+    def test_llm_backend_is_built_once(self):
+        models = ModelRegistry()
+
+        with self.settings(LLM_BACKEND="local"), ThreadPoolExecutor(max_workers=8) as pool:
+            backends = list(pool.map(lambda _: models.get_llm(), range(16)))
+
+        self.assertEqual(len({id(backend) for backend in backends}), 1)
+        self.assertIsInstance(backends[0], LocalBackend)
+        self.assertEqual(models.stats()["loaded"], {"reader": False, "llm": True})
+        self.assertIn("llm", models.stats()["load_times"])
+
+    def test_reader_calls_are_serialised(self):
+        class Reader:
+            active = 0
+            most_active = 0
+
+            def readtext(self, image, **kwargs):
+                self.active += 1
+                self.most_active = max(self.most_active, self.active)
+                time.sleep(0.01)
+                self.active -= 1
+                return [image]
+
+        models = ModelRegistry()
+        models._reader = Reader()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda n: models.readtext(n, detail=0), range(8)))
+
+        self.assertEqual(results, [[n] for n in range(8)])
+        self.assertEqual(models._reader.most_active, 1)
+        self.assertEqual(models.stats()["calls"]["ocr"]["count"], 8)
+
+    def test_preload_warms_up_in_the_background(self):
+        warmed = threading.Event()
+
+        with override_settings(OCR_PRELOAD=True), mock.patch.object(registry, "warm_up", warmed.set):
+            apps.get_app_config("restaurant_app").ready()
+            self.assertTrue(warmed.wait(5))
+
+    def test_tile_pool_follows_the_worker_count(self):
+        registry = ModelRegistry()
+
+        with mock.patch("restaurant_app.ocr.registry.ProcessPoolExecutor") as executor:
+            executor.side_effect = lambda **kwargs: mock.Mock(**kwargs)
+            two = registry.get_tile_pool(2)
+            self.assertIs(registry.get_tile_pool(2), two)
+
+            three = registry.get_tile_pool(3)
+
+        self.assertIsNot(three, two)
+        two.shutdown.assert_called_once_with(wait=False)
+        self.assertEqual((three.max_workers, three.initargs), (3, (3,)))
+
+    def test_stats_need_a_login(self):
+        self.assertEqual(self.client.get("/upload/stats/").status_code, 401)
+
+        data = self.client.get("/upload/stats/", headers=self.auth).json()
+
+        self.assertEqual(set(data), {"loaded", "load_times", "calls", "cache"})
+
+
+class PreprocessTests(SimpleTestCase):
+    def two_column_page(self, path, rotate=0):
+        image = Image.new("RGB", (4000, 5600), "white")
+        draw = ImageDraw.Draw(image)
+        for left in (200, 2200):
+            for top in range(300, 5300, 120):
+                draw.rectangle((left, top, left + 1600, top + 40), fill="black")
+        image.rotate(rotate, expand=True, fillcolor="white").save(path)
+
+    def test_photo_is_shrunk_straightened_and_split(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "menu.jpg")
+            self.two_column_page(path, rotate=3)
+            tiles, timings = preprocess(path, target_dpi=200, tile=True)
+
+        self.assertEqual(len(tiles), 2)
+        self.assertTrue(all(tile.ndim == 2 for tile in tiles))
+        self.assertLessEqual(max(tiles[0].shape), max_side_for(200) * 1.1)
+        self.assertEqual(set(timings), {"load", "grayscale", "downscale", "deskew", "tile"})
+
+    def test_skew_angle_is_detected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "menu.png")
+            self.two_column_page(path, rotate=-2)
+            image = Image.open(path).convert("L")
+
+        self.assertEqual(skew_angle(image), 2.0)
+
+
+def ocr_rows(*rows):
+    """
+    OCR detections for a page, one row per argument: a string, a
+    (text, height) pair, or a (name, price) pair with the price right-aligned.
+    """
+    detections = []
+    y = 0
+    for row in rows:
+        text, extra = (row, 20) if isinstance(row, str) else row
+        height = extra if isinstance(extra, int) else 20
+        detections.append([0, y, 10 * len(text), y + height, text, 0.95])
+        if isinstance(extra, str):
+            detections.append([440 - 10 * len(extra), y, 440, y + height, extra, 0.95])
+        y += height + 10
+    return detections
+
+
+# A page the layout parser reads with high confidence.
+MENU_ROWS = [
+    ("STARTERS", 30),
+    ("Tomato Soup", "120"),
+    ("fresh tomatoes and basil", 16),
+    ("Paneer 65 .......", "250"),
+    ("MAINS", 30),
+    ("Dal Makhani", "₹180"),
+]
+
+
+class OCRCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResultCache()
+
+        with self.settings(OCR_CACHE_DIR=self.directory, OCR_CACHE_MAX_BYTES=300):
+            for n, name in enumerate("abc"):
+                cache.put("ocr", name * 64, "x" * 96)
+                os.utime(cache._path("ocr", name * 64), (1000 * (n + 1),) * 2)
+
+            cache.get("ocr", "a" * 64)
+            cache.put("ocr", "d" * 64, "x" * 96)
+
+            self.assertEqual(
+                [name for name in "abcd" if cache.get("ocr", name * 64)],
+                ["a", "d"],
+            )
+            self.assertLessEqual(cache.stats()["bytes"], 300)
+
+    def test_repeat_upload_skips_ocr_and_llm(self):
+        path = os.path.join(self.directory, "menu.png")
+        Image.new("L", (200, 100), 255).save(path)
+        reply = '{"menu": []}'
+
+        with self.settings(OCR_CACHE_DIR=os.path.join(self.directory, "cache")):
+            ocr_cache.put("ocr", ocr_cache_key(path), ocr_rows("Soup 50"))
+            ocr_cache.put("llm", llm_cache_key(build_messages("Soup 50")), reply)
+
+            self.assertEqual(pipeline(path), {"menu": []})
+
+        self.assertFalse(registry.stats()["loaded"]["reader"])
+
+    def test_pages_are_read_together_and_merged(self):
+        paths = []
+        for n in range(2):
+            paths.append(os.path.join(self.directory, f"page-{n}.png"))
+            Image.new("L", (200, 100), 255 - n).save(paths[-1])
+
+        reply = json.dumps({"menu": [
+            {"category": "Soups", "dishes": [{"name": "Tomato", "price": None}]},
+            {"category": "soups ", "dishes": [
+                {"name": "tomato", "price": 50},
+                {"name": "Onion", "price": 60},
+            ]},
+        ]})
+
+        with self.settings(OCR_CACHE_DIR=os.path.join(self.directory, "cache")):
+            ocr_cache.put("ocr", ocr_cache_key(paths[0]), ocr_rows("Soups", "Tomato"))
+            ocr_cache.put("ocr", ocr_cache_key(paths[1]), ocr_rows("tomato 50", "Onion 60"))
+            (text,) = llm_batches(["Soups\nTomato", "tomato 50\nOnion 60"])
+            ocr_cache.put("llm", llm_cache_key(build_messages(text)), reply)
+
+            menu = pipeline(paths)
+
+        self.assertEqual(menu["menu"][0]["category"], "Soups")
+        self.assertEqual(
+            [(dish["name"], dish["price"]) for dish in menu["menu"][0]["dishes"]],
+            [("Tomato", 50), ("Onion", 60)],
+        )
+        self.assertEqual(len(menu["menu"]), 1)
+
+    def test_confident_layout_skips_the_llm(self):
+        class OfflineBackend(LocalBackend):
+            def stream(self, messages):
+                raise AssertionError("LLM should not be called")
+
+        previous, registry._llm = registry._llm, OfflineBackend()
+        self.addCleanup(setattr, registry, "_llm", previous)
+
+        path = os.path.join(self.directory, "menu.png")
+        Image.new("L", (200, 100), 255).save(path)
+        rows = ocr_rows(*MENU_ROWS)
+
+        menu, confidence = parse_layout(rows)
+        self.assertGreaterEqual(confidence, 0.7)
+        self.assertLess(parse_layout(ocr_rows(("Tomato Soup", "120"), "Paneer 65 250 Naan 40"))[1], 0.7)
+
+        with self.settings(OCR_CACHE_DIR=os.path.join(self.directory, "cache")):
+            ocr_cache.put("ocr", ocr_cache_key(path), rows)
+            self.assertEqual(pipeline(path), menu)
+
+        self.assertEqual(
+            [(c["category"], [d["name"] for d in c["dishes"]]) for c in menu["menu"]],
+            [("STARTERS", ["Tomato Soup", "Paneer 65"]), ("MAINS", ["Dal Makhani"])],
+        )
+        self.assertEqual(menu["menu"][0]["dishes"][0]["description"], "fresh tomatoes and basil")
+
+
+class OCRJobTests(OwnerTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(self.settings(
+            MEDIA_ROOT=directory.name,
+            OCR_CACHE_DIR=os.path.join(directory.name, "cache"),
+        ))
+        self.uploads = os.path.join(directory.name, "uploads")
+
+        # The upload's OCR result is already cached, so jobs finish without
+        # loading a reader or calling an LLM.
+        path = os.path.join(directory.name, "menu.png")
+        Image.new("L", (200, 100), 255).save(path)
+        with open(path, "rb") as f:
+            self.image = f.read()
+        ocr_cache.put("ocr", ocr_cache_key(path), ocr_rows(*MENU_ROWS))
+
+    def upload(self):
+        return self.client.post(
+            "/upload/",
+            {"menu": SimpleUploadedFile("menu.png", self.image, "image/png")},
+            headers=self.auth,
+        )
+
+    def wait_for(self, job_id):
+        deadline = time.monotonic() + 10
+        while True:
+            job = self.client.get(f"/upload/{job_id}/", headers=self.auth).json()
+            if job["status"] in ("done", "failed") or time.monotonic() > deadline:
+                return job
+            time.sleep(0.02)
+
+    def test_upload_is_processed_in_the_background(self):
+        response = self.upload()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], "queued")
+
+        job = self.wait_for(response.json()["job_id"])
+
+        self.assertEqual((job["status"], job["progress"]), ("done", 100))
+        self.assertEqual(
+            [category["category"] for category in job["result"]["menu"]],
+            ["STARTERS", "MAINS"],
+        )
+
+        # Uploads are removed just after the job is marked done.
+        deadline = time.monotonic() + 5
+        while os.listdir(self.uploads) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(os.listdir(self.uploads), [])
+
+    def test_jobs_are_visible_to_their_owner_only(self):
+        job_id = self.upload().json()["job_id"]
+        other = User.objects.create_user("other", "other@example.com", "password")
+
+        response = self.client.get(f"/upload/{job_id}/", headers=self.bearer(other))
+
+        self.assertEqual(response.status_code, 404)
+        self.wait_for(job_id)
+
+    def test_full_queue_rejects_uploads(self):
+        with self.settings(OCR_MAX_PENDING=0):
+            response = self.upload()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(os.listdir(self.uploads), [])
+
+    def test_finished_jobs_expire(self):
+        job_id = self.upload().json()["job_id"]
+        self.assertEqual(self.wait_for(job_id)["status"], "done")
+
+        # Expired jobs are pruned when the next one is submitted.
+        with self.settings(OCR_JOB_TTL=0):
+            next_job_id = self.upload().json()["job_id"]
+
+        response = self.client.get(f"/upload/{job_id}/", headers=self.auth)
+
+        self.assertEqual(response.status_code, 404)
+        self.wait_for(next_job_id)
+
+
+class LLMBackendTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_reply_is_parsed_as_it_streams(self):
+        reply = '```json\n{"menu": [{"category": "Soups", "dishes": [{"name": "Tomato", "price": "50"}]}]}\n```\nEnjoy!'
+        parser = MenuStreamParser()
+
+        chunks = [reply[i:i + 7] for i in range(0, len(reply), 7)]
+        fed = next(n for n, chunk in enumerate(chunks, start=1) if parser.feed(chunk))
+
+        self.assertLess(fed, len(chunks))
+        self.assertEqual(parser.close()["menu"][0]["dishes"][0]["price"], 50.0)
+
+        with self.assertRaises(MenuSchemaError):
+            MenuStreamParser().feed("Sorry, I")
+        with self.assertRaises(MenuSchemaError):
+            parse_menu_reply('{"menu": [{"category": "Soups", "dishes": [{"price": 5}]}]}')
+
+    def test_bad_replies_are_retried_on_the_local_backend(self):
+        class FlakyBackend(LocalBackend):
+            calls = 0
+
+            def stream(self, messages):
+                self.calls += 1
+                if self.calls == 1:
+                    yield "I could not read this menu."
+                    return
+                yield from super().stream(messages)
+
+        backend = FlakyBackend()
+        previous, registry._llm = registry._llm, backend
+        self.addCleanup(setattr, registry, "_llm", previous)
+
+        with self.settings(
+            LLM_BACKEND="local",
+            LLM_RETRY_BACKOFF=0,
+            OCR_CACHE_DIR=self.directory,
+        ):
+            menu = parse_menu_text("Soups\nTomato Soup ..... 120\nPaneer 65 - ₹1,250\n")
+
+        self.assertEqual(backend.calls, 2)
+        self.assertEqual(menu["menu"][0]["category"], "Soups")
+        self.assertEqual(
+            [(dish["name"], dish["price"]) for dish in menu["menu"][0]["dishes"]],
+            [("Tomato Soup", 120.0), ("Paneer 65", 1250.0)],
+        )
@@ -7,14 +7,27 @@ urlpatterns = [
     path('signup/', views.create_user),
     path('login/', views.login_user),
     path('register/', views.register_restaurant),
+    path('menu/<int:restaurant_id>/', views.edit_menu),
+    path('menu/<int:restaurant_id>/import/', views.import_restaurant_menu),
     path('upload/', views.upload_menu),
+    path('upload/stats/', views.ocr_stats),
+    path('metrics', views.metrics),
+    path('upload/<uuid:job_id>/', views.upload_status),
     path('remove/', views.remove_restaurant),
+    path('qr/<int:restaurant_id>/regenerate/', views.regenerate_qrs),
+    path('qr/<int:restaurant_id>/export.zip', views.export_qr_zip),
+    path('qr/<int:restaurant_id>/sheet.html', views.export_qr_sheet),
+    path('qr/<int:restaurant_id>/<int:table_number>.<str:image_format>', views.table_qr),
     path('info/<int:restaurant_id>/', views.get_info),
     path('currentorders/<int:restaurant_id>/', views.current_orders),
+    path('currentorders/<int:restaurant_id>/stream/', views.order_stream),
+    path('board/<int:restaurant_id>/', views.order_board),
     path('placeorder/<int:restaurant_id>/<int:table_id>/', views.place_order),
     path('orders/<int:order_id>/', views.get_status),
     path('updateorder/<int:order_id>/', views.update_status),
     path('dashboard-data/', views.dashboard_data),
+    path('analytics/<int:restaurant_id>/', views.sales_analytics),
+    path('analytics/<int:restaurant_id>/kitchen/', views.kitchen_latency),
 ]
 
 if settings.DEBUG:
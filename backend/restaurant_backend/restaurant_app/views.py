@@ -1,21 +1,69 @@
+import hmac
 import uuid
 import json
 import os
+import time
 from django.conf import settings
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.contrib.auth import authenticate
 from django.shortcuts import get_object_or_404
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import IsAuthenticated
-from .qr.qrCode import generate_qr
-from .ocr.pipeline import pipeline
+from .qr.qrCode import QR_FORMATS, table_qr_url
+from .qr.cache import qr_cache, qr_digest
+from .qr.export import iter_qr_zip, iter_qr_sheet
+from .ocr.registry import registry
+from .ocr.cache import ocr_cache
+from .profiling.metrics import request_metrics
+from .ocr.jobs import jobs, QueueFull
+from .events.broker import broker
+from .events.stream import order_events
+from .events.watch import order_watcher
+from .menu.cache import get_menu_version, get_menu_json, menu_etag
+from .menu.editing import InvalidPatch, PatchTargetMissing, apply_menu_patch
+from .menu.importer import (
+    MenuImportError,
+    flatten_menu,
+    import_menu,
+    read_menu_file,
+    validate_menu,
+)
+from .analytics.sales import (
+    DEFAULT_REPORT_DAYS,
+    MAX_REPORT_DAYS,
+    record_order,
+    record_served,
+    sales_report,
+)
+from .orders.kitchen import (
+    DEFAULT_WINDOW_MINUTES,
+    MAX_WINDOW_MINUTES,
+    record_transition,
+    served_before,
+    kitchen_metrics,
+)
+from .orders.board import (
+    BOARD_STATUSES,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursor,
+    board_changes,
+    board_page,
+    serialize_order,
+    sync_token,
+)
 
 from .models import (
     Restaurant,
-    MenuCategory,
     MenuItem,
     Table,
     Order,
@@ -86,36 +134,88 @@ def login_user(request):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def upload_menu(request):
-    image = request.FILES.get("menu")
+    images = request.FILES.getlist("menu")
 
-    if not image:
+    if not images:
         return Response({"error": "No menu image provided"}, status=400)
 
+    max_pages = getattr(settings, "OCR_MAX_PAGES", 20)
+    if len(images) > max_pages:
+        return Response(
+            {"error": f"A menu can have at most {max_pages} pages"},
+            status=400
+        )
+
     job_id = str(uuid.uuid4())
 
     upload_dir = os.path.join(settings.MEDIA_ROOT, "uploads")
     os.makedirs(upload_dir, exist_ok=True)
 
-    image_path = os.path.join(upload_dir, f"{job_id}.jpg")
+    # Pages keep their upload order, which is the order the menu is read in.
+    image_paths = []
+    for number, image in enumerate(images):
+        extension = ".pdf" if image.name.lower().endswith(".pdf") else ".jpg"
+        image_path = os.path.join(upload_dir, f"{job_id}-{number}{extension}")
 
-    try:
         with open(image_path, "wb+") as f:
             for chunk in image.chunks():
                 f.write(chunk)
 
-        # OCR
-        result = pipeline(image_path)
-        cleaned = result.replace("```json", "").replace("```", "").strip()
-        parsed = json.loads(cleaned)
+        image_paths.append(image_path)
 
+    try:
+        job = jobs.submit(job_id, request.user.id, image_paths)
+    except QueueFull:
+        for image_path in image_paths:
+            os.remove(image_path)
         return Response(
-            {"result": parsed},
-            status=202
+            {"error": "Too many menus are being processed, try again shortly"},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
 
-    finally:
-        if os.path.exists(image_path):
-            os.remove(image_path)
+    return Response(job, status=202)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def upload_status(request, job_id):
+    # One lookup, so a job pruned mid-request is a 404 rather than a null body.
+    job = jobs.get(str(job_id), owner_id=request.user.id)
+
+    if job is None:
+        return Response({"error": "Job not found"}, status=404)
+
+    return Response(job)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def ocr_stats(request):
+    return Response(dict(registry.stats(), cache=ocr_cache.stats()))
+
+def metrics_allowed(request):
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        return False
+
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token:
+        return True
+
+    return hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(),
+        f"Bearer {token}".encode()
+    )
+
+def metrics(request):
+    """
+    Request metrics in the Prometheus text format, for local scrapers (and,
+    with METRICS_TOKEN set, only those sending the token)
+    """
+    if not getattr(settings, "PROFILING", False) or not metrics_allowed(request):
+        raise Http404
+
+    return HttpResponse(
+        request_metrics.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -124,12 +224,15 @@ def register_restaurant(request):
     user = request.user   
 
     try:
-        menu_items = json.loads(data.get("restaurant_menu", "[]"))
+        if "menu_file" in request.FILES:
+            menu_rows = read_menu_file(request.FILES["menu_file"])
+        else:
+            menu_rows = flatten_menu(json.loads(data.get("restaurant_menu", "[]")))
+        menu_rows = validate_menu(menu_rows)
     except json.JSONDecodeError:
         return Response({"error": "Invalid menu format"}, status=400)
-
-    if not menu_items:
-        return Response({"error": "Menu cannot be empty"}, status=400)
+    except MenuImportError as e:
+        return Response({"error": "Invalid menu", "details": e.errors}, status=400)
 
     try:
         table_count = int(data.get("restaurant_tables", 0))
@@ -145,73 +248,68 @@ def register_restaurant(request):
             description=data.get("restaurant_description", ""),
             address=data.get("restaurant_address"),
             no_of_tables=table_count,
+            frontend_base_url=data.get("frontend_base_url") or "",
         )
 
-        category_map = {}
-
-        for item in menu_items:
-            category_name = item.get("category", "").strip()
-            if not category_name:
-                return Response({"error": "Menu item missing category"}, status=400)
-
-            if category_name not in category_map:
-                category_obj, _ = MenuCategory.objects.get_or_create(
-                    restaurant=restaurant,
-                    name=category_name,
-                )
-                category_map[category_name] = category_obj
-
-        menu_objects = [
-            MenuItem(
-                category=category_map[item["category"]],
-                name=item["name"],
-                description=item.get("description", ""),
-                price=item["price"],
-                is_available=True,
-                is_veg=item.get("veg", True)
-            )
-            for item in menu_items
-        ]
-
-        MenuItem.objects.bulk_create(menu_objects)
-
-        for table_number in range(1, table_count + 1):
-            token = uuid.uuid4().hex
+        imported = import_menu(restaurant, menu_rows)
 
-            table = Table.objects.create(
+        # QR images are rendered on demand by table_qr, not stored per table.
+        Table.objects.bulk_create([
+            Table(
                 restaurant=restaurant,
                 table_number=table_number,
-                qr_token=token,
-            )
-            frontend_base_url = request.data.get("frontend_base_url")
-            qr_url = f"{frontend_base_url}customer/order/{restaurant.id}/{table_number}/"
-
-            qr_path = generate_qr(
-                link=qr_url,
-                filename=f"restaurant_{restaurant.id}_table_{table_number}"
+                qr_token=uuid.uuid4().hex,
             )
-
-            table.qr_image = qr_path
-            table.save()
+            for table_number in range(1, table_count + 1)
+        ])
 
     return Response(
         {
             "message": "Restaurant setup completed",
             "restaurant_id": restaurant.id,
             "tables_created": table_count,
-            "categories": len(category_map),
-            "menu_items": len(menu_objects),
+            "categories": imported["categories_created"],
+            "menu_items": imported["items_created"],
         },
         status=201
     )
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def import_restaurant_menu(request, restaurant_id):
+    """
+    Adds or updates menu items from an uploaded CSV/JSON file ("file") or a
+    JSON body ({"menu": [...]})
+    """
+    restaurant = get_object_or_404(
+        Restaurant,
+        id=restaurant_id,
+        owner=request.user
+    )
+
+    try:
+        if "file" in request.FILES:
+            rows = read_menu_file(request.FILES["file"])
+        else:
+            rows = flatten_menu(request.data)
+        rows = validate_menu(rows)
+    except MenuImportError as e:
+        return Response(
+            {"error": "Invalid menu", "details": e.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(import_menu(restaurant, rows), status=status.HTTP_201_CREATED)
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def remove_restaurant(request):
     restaurant = get_object_or_404(Restaurant, owner=request.user)
 
     with transaction.atomic():
-        for table in restaurant.tables.all():
+        # Only restaurants registered before on-demand QR rendering have
+        # stored images left to clean up.
+        for table in restaurant.tables.exclude(qr_image="").exclude(qr_image=None):
             if table.qr_image:
                 try:
                     file_path = table.qr_image.path
@@ -227,40 +325,226 @@ def remove_restaurant(request):
         status=200
     )
 
+# QR images only change when their content does, and their ETag is a hash
+# of that content, so they can be cached for a long time.
+QR_MAX_AGE = 60 * 60 * 24 * 30
+QR_MIN_SIZE = 64
+QR_MAX_SIZE = 2048
+
+def parse_qr_size(request):
+    size = int(request.query_params.get("size", 0)) or None
+
+    if size is not None:
+        size = max(QR_MIN_SIZE, min(size, QR_MAX_SIZE))
+
+    return size
+
+def streaming_response(request, chunks, content_type):
+    # Django's ASGI handler reads a sync iterator to the end before sending
+    # it, so hand it an async one that pulls a chunk at a time instead.
+    if isinstance(request._request, ASGIRequest):
+        async def pull():
+            while True:
+                chunk = await sync_to_async(next)(chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+
+        return StreamingHttpResponse(pull(), content_type=content_type)
+
+    return StreamingHttpResponse(chunks, content_type=content_type)
+
 @api_view(["GET"])
-def get_info(request, restaurant_id):
+def table_qr(request, restaurant_id, table_number, image_format):
+    if image_format not in QR_FORMATS:
+        return Response({"error": "Unsupported format"}, status=400)
+
     try:
-        restaurant = Restaurant.objects.get(id=restaurant_id)
-    except Restaurant.DoesNotExist:
-        return Response({"error": "Restaurant not found"}, status=404)
+        size = parse_qr_size(request)
+    except ValueError:
+        return Response({"error": "Invalid size"}, status=400)
 
-    # Use 'items' because that's the related_name in MenuItem
-    categories = MenuCategory.objects.filter(restaurant=restaurant).prefetch_related('items')
-
-    menu = []
-    for category in categories:
-        menu.append({
-            "category": category.name,
-            "items": [
-                {
-                    "id": item.id,
-                    "name": item.name,
-                    "description": item.description,
-                    "price": float(item.price),
-                    "veg": getattr(item, 'is_veg', True),  # Add if you implement veg/non-veg later
-                    "available": item.is_available,
-                }
-                for item in category.items.all()
-            ]
-        })
+    frontend_base_url = Restaurant.objects.filter(
+        id=restaurant_id,
+        tables__table_number=table_number
+    ).values_list("frontend_base_url", flat=True).first()
 
-    return Response({
-        "restaurant": {
-            "name": restaurant.name,
-            "description": restaurant.description,
-            "address": restaurant.address,
+    if frontend_base_url is None:
+        return Response({"error": "Table not found"}, status=404)
+
+    link = table_qr_url(frontend_base_url, restaurant_id, table_number)
+    etag = f'"{qr_digest(link, image_format, size)}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={QR_MAX_AGE}",
+    }
+
+    if etag_matches(request, etag):
+        return HttpResponse(status=304, headers=headers)
+
+    return HttpResponse(
+        qr_cache.get(link, image_format, size),
+        content_type=QR_FORMATS[image_format],
+        headers=headers
+    )
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_qr_zip(request, restaurant_id):
+    restaurant = get_object_or_404(
+        Restaurant,
+        id=restaurant_id,
+        owner=request.user
+    )
+
+    image_format = request.query_params.get("image", "png")
+
+    if image_format not in QR_FORMATS:
+        return Response({"error": "Unsupported format"}, status=400)
+
+    try:
+        size = parse_qr_size(request)
+    except ValueError:
+        return Response({"error": "Invalid size"}, status=400)
+
+    table_numbers = list(restaurant.tables.order_by(
+        "table_number"
+    ).values_list("table_number", flat=True))
+
+    response = streaming_response(
+        request,
+        iter_qr_zip(restaurant, table_numbers, image_format, size),
+        "application/zip"
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="restaurant_{restaurant.id}_qrcodes.zip"'
+    )
+    return response
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_qr_sheet(request, restaurant_id):
+    restaurant = get_object_or_404(
+        Restaurant,
+        id=restaurant_id,
+        owner=request.user
+    )
+
+    table_numbers = list(restaurant.tables.order_by(
+        "table_number"
+    ).values_list("table_number", flat=True))
+
+    return streaming_response(
+        request,
+        iter_qr_sheet(restaurant, table_numbers),
+        "text/html; charset=utf-8"
+    )
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def regenerate_qrs(request, restaurant_id):
+    restaurant = get_object_or_404(
+        Restaurant,
+        id=restaurant_id,
+        owner=request.user
+    )
+
+    frontend_base_url = request.data.get("frontend_base_url")
+
+    if frontend_base_url:
+        restaurant.frontend_base_url = frontend_base_url
+        restaurant.save(update_fields=["frontend_base_url"])
+
+    table_numbers = restaurant.tables.order_by(
+        "table_number"
+    ).values_list("table_number", flat=True)
+
+    # Pre-render so a print run right after doesn't pay for every image.
+    qr_cache.warm([
+        table_qr_url(restaurant.frontend_base_url, restaurant.id, number)
+        for number in table_numbers
+    ])
+
+    return Response(
+        {
+            "message": "QR codes regenerated",
+            "tables": len(table_numbers),
         },
-        "menu": menu,
+        status=200
+    )
+
+# Customers may see a menu change up to this many seconds late; after that
+# the browser revalidates and gets a cheap 304 if nothing changed.
+MENU_MAX_AGE = 10
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get("If-None-Match", "")
+    return etag in [tag.strip() for tag in if_none_match.split(",")]
+
+@api_view(["PATCH"])
+@permission_classes([IsAuthenticated])
+def edit_menu(request, restaurant_id):
+    """
+    Batch item and category changes, e.g.
+    {"items": [{"id": 4, "available": false}], "categories": [{"id": 2, "order": 0}]}
+    """
+    restaurant = get_object_or_404(
+        Restaurant,
+        id=restaurant_id,
+        owner=request.user
+    )
+
+    try:
+        result = apply_menu_patch(restaurant, request.data)
+    except InvalidPatch as e:
+        return Response(
+            {"error": "Invalid menu changes", "details": e.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except PatchTargetMissing as e:
+        return Response(
+            {"error": "Some items or categories are not on this menu", "ids": e.args[0]},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except IntegrityError:
+        return Response(
+            {"error": "Category names must be unique"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    result["menu_version"] = get_menu_version(restaurant.id)
+    return Response(result)
+
+@api_view(["GET"])
+def get_info(request, restaurant_id):
+    # Served from the menu cache: a revalidation is answered without touching
+    # the database, and a plain repeat scan costs no queries either.
+    version = get_menu_version(restaurant_id)
+    etag = menu_etag(restaurant_id, version)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={MENU_MAX_AGE}",
+    }
+
+    if etag_matches(request, etag):
+        return HttpResponse(status=304, headers=headers)
+
+    data = get_menu_json(restaurant_id, version)
+
+    if data is None:
+        return Response({"error": "Restaurant not found"}, status=404)
+
+    return HttpResponse(data, content_type="application/json", headers=headers)
+
+def publish_order(restaurant_id, order_id, event_type):
+    # Skip the extra queries entirely when no dashboard is listening.
+    if not broker.has_subscribers(restaurant_id):
+        return
+
+    order = Order.objects.prefetch_related("items__item", "table").get(id=order_id)
+    broker.publish(restaurant_id, {
+        "type": event_type,
+        "order": serialize_order(order),
     })
 
 @api_view(["GET"])
@@ -282,43 +566,99 @@ def current_orders(request, restaurant_id):
         status="served"
     ).prefetch_related("items__item", "table").order_by("-created_at")
 
-    def serialize_order(order):
-        return {
-            "order_id": order.id,
-            "table_number": order.table.table_number if order.table else None,
-            "status": order.status,
-            "created_at": order.created_at,
-            "items": [
-                {
-                    "name": oi.item.name,
-                    "quantity": oi.quantity,
-                    "price": oi.item.price,
-                    "is_veg": oi.item.is_veg,
-                }
-                for oi in order.items.all()
-            ],
-        }
-
     return Response({
         "restaurant": restaurant.name,
         "pending_orders": [serialize_order(o) for o in pending_orders],
         "served_orders": [serialize_order(o) for o in served_orders],
     })
 
-@api_view(["POST"])
-def place_order(request, restaurant_id, table_id):
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def order_board(request, restaurant_id):
+    """
+    Paginated order board. Without ?since= it returns a page of orders in
+    the requested status group (?status=open|served|all, ?cursor= for the
+    next page) plus a sync token. With ?since=<sync token> it returns only
+    orders created or changed after that token, and the ids of orders
+    archived since then.
+    """
     restaurant = get_object_or_404(
         Restaurant,
         id=restaurant_id,
-        is_active=True
+        owner=request.user
+    )
+
+    try:
+        limit = int(request.query_params.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return Response({"error": "Invalid limit"}, status=400)
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    since = request.query_params.get("since")
+
+    try:
+        if since:
+            return Response(board_changes(restaurant, since, limit))
+
+        statuses = BOARD_STATUSES.get(request.query_params.get("status", "open"))
+        if statuses is None:
+            return Response({"error": "Invalid status"}, status=400)
+
+        # Taken before the page is read so nothing changed in between is missed.
+        token = sync_token(restaurant)
+        page = board_page(restaurant, statuses, request.query_params.get("cursor"), limit)
+    except InvalidCursor:
+        return Response({"error": "Invalid cursor"}, status=400)
+
+    return Response(dict(page, sync_token=token))
+
+async def order_stream(request, restaurant_id):
+    """
+    Server-sent events for the kitchen dashboard. EventSource cannot send
+    headers, so the access token comes in the ?token= query parameter.
+    """
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI Django collects an async stream before sending any of
+        # it, so no event would ever arrive; failing fast lets the dashboard
+        # fall back to polling.
+        return JsonResponse(
+            {"error": "Live order updates need the ASGI server"},
+            status=503
+        )
+
+    jwt_auth = JWTAuthentication()
+
+    try:
+        validated = jwt_auth.get_validated_token(request.GET.get("token", ""))
+        user = await sync_to_async(jwt_auth.get_user)(validated)
+    except (InvalidToken, AuthenticationFailed):
+        return JsonResponse({"detail": "Invalid token"}, status=401)
+
+    owns_restaurant = await Restaurant.objects.filter(
+        id=restaurant_id,
+        owner=user
+    ).aexists()
+
+    if not owns_restaurant:
+        return JsonResponse({"error": "Restaurant not found"}, status=404)
+
+    response = StreamingHttpResponse(
+        order_events(restaurant_id),
+        content_type="text/event-stream"
     )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
+@api_view(["POST"])
+def place_order(request, restaurant_id, table_id):
     table = get_object_or_404(
-        Table,
+        Table.objects.select_related("restaurant"),
         table_number=table_id,
-        restaurant=restaurant
+        restaurant_id=restaurant_id,
+        restaurant__is_active=True
     )
-
+    restaurant = table.restaurant
 
     items_data = request.data.get("items")
 
@@ -328,36 +668,69 @@ def place_order(request, restaurant_id, table_id):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    # Validate every line and merge repeated items before touching the
+    # database, so the write transaction is just a handful of inserts.
+    quantities = {}
+
+    for entry in items_data:
+        if not isinstance(entry, dict):
+            entry = {}
+
+        item_id = entry.get("item_id")
+        quantity = entry.get("quantity", 1)
+
+        # bool is an int subclass, so JSON true would otherwise pass as 1.
+        if (
+            not isinstance(item_id, int)
+            or not isinstance(quantity, int)
+            or isinstance(item_id, bool)
+            or isinstance(quantity, bool)
+            or quantity <= 0
+        ):
+            return Response(
+                {"error": "Invalid item data"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        quantities[item_id] = quantities.get(item_id, 0) + quantity
+
+    menu_items = MenuItem.objects.filter(
+        category__restaurant=restaurant,
+        is_available=True
+    ).in_bulk(list(quantities))
+
+    if len(menu_items) != len(quantities):
+        return Response(
+            {"error": "Some items are unavailable"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    order_items = [
+        OrderItem(
+            item=menu_items[item_id],
+            quantity=quantity,
+            unit_price=menu_items[item_id].price
+        )
+        for item_id, quantity in quantities.items()
+    ]
+
     with transaction.atomic():
         order = Order.objects.create(
             restaurant=restaurant,
             table=table,
-            status="pending"
+            status="pending",
+            total=sum(oi.unit_price * oi.quantity for oi in order_items)
         )
 
-        for entry in items_data:
-            item_id = entry.get("item_id")
-            quantity = entry.get("quantity", 1)
-
-            if not item_id or quantity <= 0:
-                transaction.set_rollback(True)
-                return Response(
-                    {"error": "Invalid item data"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            menu_item = get_object_or_404(
-                MenuItem,
-                id=item_id,
-                category__restaurant=restaurant,
-                is_available=True
-            )
+        for order_item in order_items:
+            order_item.order = order
 
-            OrderItem.objects.create(
-                order=order,
-                item=menu_item,
-                quantity=quantity
-            )
+        OrderItem.objects.bulk_create(order_items)
+        record_order(order, order_items)
+
+        transaction.on_commit(
+            lambda: publish_order(restaurant.id, order.id, "order.created")
+        )
 
     return Response(
         {
@@ -369,55 +742,116 @@ def place_order(request, restaurant_id, table_id):
         status=status.HTTP_201_CREATED
     )
 
+# Upper bound for ?wait= on the order status endpoint, and how often a held
+# request re-reads the order in case it was changed by another process.
+STATUS_LONG_POLL_MAX = 25
+STATUS_RECHECK_INTERVAL = 5
+
+def order_etag(order_id, order_status):
+    # Order lines never change after placement, so the status is the only
+    # part of the status payload that can go stale.
+    return f'"order-{order_id}-{order_status}"'
+
 @api_view(["GET"])
 def get_status(request, order_id):
-    order = get_object_or_404(
-        Order.objects.prefetch_related("items__item"),
+    current_status = Order.objects.filter(
         id=order_id
-    )
+    ).values_list("status", flat=True).first()
+
+    if current_status is None:
+        return Response({"error": "Order not found"}, status=404)
+
+    etag = order_etag(order_id, current_status)
+
+    try:
+        wait = min(float(request.query_params.get("wait", 0)), STATUS_LONG_POLL_MAX)
+    except ValueError:
+        wait = 0
+
+    if wait > 0 and etag_matches(request, etag):
+        deadline = time.monotonic() + wait
+        initial_status = current_status
+
+        while current_status == initial_status:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
 
-    items = []
-    total = 0
+            order_watcher.wait(order_id, min(remaining, STATUS_RECHECK_INTERVAL))
+            current_status = Order.objects.filter(
+                id=order_id
+            ).values_list("status", flat=True).first()
 
-    for oi in order.items.all():
-        price = float(oi.item.price)
-        subtotal = price * oi.quantity
-        total += subtotal
+        etag = order_etag(order_id, current_status)
 
-        items.append({
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    order = get_object_or_404(
+        Order.objects.select_related("table").prefetch_related("items__item"),
+        id=order_id
+    )
+
+    items = [
+        {
             "name": oi.item.name,
             "quantity": oi.quantity,
-            "price": price,
-        })
+            "price": float(oi.unit_price),
+        }
+        for oi in order.items.all()
+    ]
 
     return Response({
         "order_id": order.id,
         "status": order.status, 
         "table": order.table.table_number if order.table else None,
         "items": items,         
-        "total": total,          
+        "total": float(order.total),          
+    }, headers={
+        "ETag": order_etag(order.id, order.status),
+        "Cache-Control": "no-cache",
     })
 
 @api_view(["PATCH"])
 @permission_classes([IsAuthenticated])
 def update_status(request, order_id):
-    order = get_object_or_404(
-        Order,
-        id=order_id,
-        restaurant__owner=request.user
-    )
-
     ALLOWED_STATUSES = ["pending", "preparing", "ready", "served"]
     new_status = request.data.get("status")
 
-    if new_status not in ALLOWED_STATUSES:
-        return Response(
-            {"error": "Invalid status"},
-            status=status.HTTP_400_BAD_REQUEST
+    with transaction.atomic():
+        # Locked so concurrent updates cannot both count the first serve.
+        order = get_object_or_404(
+            Order.objects.select_for_update(of=("self",)),
+            id=order_id,
+            restaurant__owner=request.user
+        )
+
+        if new_status not in ALLOWED_STATUSES:
+            return Response(
+                {"error": "Invalid status"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        previous_status = order.status
+        order.status = new_status
+
+        # served -> preparing -> served counts once, like the backfill.
+        first_serve = (
+            new_status == "served"
+            and previous_status != "served"
+            and not served_before(order.id)
         )
 
-    order.status = new_status
-    order.save()
+        order.save()
+
+        if new_status != previous_status:
+            record_transition(order, previous_status)
+
+        if first_serve:
+            record_served(order)
+
+    order_watcher.notify(order.id)
+    publish_order(order.restaurant_id, order.id, "order.updated")
 
     return Response(
         {
@@ -427,6 +861,57 @@ def update_status(request, order_id):
         status=status.HTTP_200_OK
     )
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def sales_analytics(request, restaurant_id):
+    """
+    Revenue per day, top dishes and average ticket time, read from the
+    pre-aggregated daily counters
+    """
+    restaurant = get_object_or_404(
+        Restaurant,
+        id=restaurant_id,
+        owner=request.user
+    )
+
+    try:
+        days = int(request.query_params.get("days", DEFAULT_REPORT_DAYS))
+    except ValueError:
+        days = 0
+
+    if not 1 <= days <= MAX_REPORT_DAYS:
+        return Response(
+            {"error": f"days must be between 1 and {MAX_REPORT_DAYS}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(sales_report(restaurant, days))
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def kitchen_latency(request, restaurant_id):
+    """
+    p50/p95 prep and serve times over the last ?minutes=, overall and per dish
+    """
+    restaurant = get_object_or_404(
+        Restaurant,
+        id=restaurant_id,
+        owner=request.user
+    )
+
+    try:
+        minutes = int(request.query_params.get("minutes", DEFAULT_WINDOW_MINUTES))
+    except ValueError:
+        minutes = 0
+
+    if not 1 <= minutes <= MAX_WINDOW_MINUTES:
+        return Response(
+            {"error": f"minutes must be between 1 and {MAX_WINDOW_MINUTES}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(kitchen_metrics(restaurant, minutes))
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def dashboard_data(request):
@@ -5,6 +5,13 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+The kitchen dashboard's live order stream (currentorders/<id>/stream/) is an
+async view and needs to be served through this entry point, e.g.
+
+    uvicorn restaurant_backend.asgi:application --workers 1
+
+Order events are published in-process, so run a single worker process.
 """
 
 import os
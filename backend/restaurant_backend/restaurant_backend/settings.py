@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,7 +27,14 @@ SECRET_KEY = 'django-insecure-kt&0vrv)%kdnfh7)3o(sxh9!0)5f(@_8ctj8@5_%h0)ptt)mmw
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
-ALLOWED_HOSTS = ["192.168.29.204"]
+# Comma-separated. Loopback is always allowed so local tools (the benchmark
+# commands, /metrics scrapers) can reach the server; add the LAN or public
+# host name the site is served on.
+ALLOWED_HOSTS = ["localhost", "127.0.0.1", "[::1]"] + [
+    host.strip()
+    for host in os.getenv("ALLOWED_HOSTS", "192.168.29.204").split(",")
+    if host.strip()
+]
 
 
 # Application definition
@@ -45,6 +54,7 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'restaurant_app.profiling.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -60,6 +70,10 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
 
+# Customers revalidate order status with If-None-Match and read back the ETag.
+CORS_ALLOW_HEADERS = (*default_headers, "if-none-match")
+CORS_EXPOSE_HEADERS = ["ETag"]
+
 ROOT_URLCONF = 'restaurant_backend.urls'
 
 TEMPLATES = [
@@ -82,11 +96,69 @@ WSGI_APPLICATION = 'restaurant_backend.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
+#
+# DB_ENGINE=sqlite (default) suits a single small venue. DB_ENGINE=postgres
+# needs psycopg installed (psycopg[pool] when DB_POOL=1) and the DB_NAME,
+# DB_USER, DB_PASSWORD, DB_HOST and DB_PORT variables.
+
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgres":
+    DB_POOL = os.getenv("DB_POOL", "1") == "1"
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("DB_NAME", "restaurant"),
+            'USER': os.getenv("DB_USER", "restaurant"),
+            'PASSWORD': os.getenv("DB_PASSWORD", ""),
+            'HOST': os.getenv("DB_HOST", "localhost"),
+            'PORT': os.getenv("DB_PORT", "5432"),
+            # Django's pool and persistent connections are mutually exclusive:
+            # pooled connections are returned after every request, otherwise
+            # each worker thread keeps its own connection open.
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv("DB_POOL_MIN", "2")),
+                    'max_size': int(os.getenv("DB_POOL_MAX", "10")),
+                    'timeout': 10,
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # WAL lets readers run alongside the single writer; NORMAL
+                # sync is safe in WAL mode and skips an fsync per commit.
+                # journal_mode is stored in the database file itself, so the
+                # first connection switches db.sqlite3 to WAL for good (which
+                # is why the file is not tracked in git).
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+                # Take the write lock at BEGIN so concurrent writers queue on
+                # the busy timeout instead of failing with "database is
+                # locked" when upgrading from a read lock mid-transaction.
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+        }
+    }
 
-DATABASES = {
+
+# Cache
+# The public menu and its version counter live here. The local-memory cache is
+# per process; point this at a shared backend (Redis, memcached, file-based)
+# when running several workers so menu edits invalidate all of them.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'restaurant-app',
     }
 }
 
@@ -144,4 +216,72 @@ SIMPLE_JWT = {
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR/'media'
 
-
+# Rendered table QR codes, keyed by a hash of their content. Restaurants that
+# registered without a frontend URL get QR links pointing at FRONTEND_BASE_URL.
+# Least recently used images are evicted once the cache outgrows
+# QR_CACHE_MAX_BYTES.
+QR_CACHE_DIR = MEDIA_ROOT/'qrcache'
+QR_CACHE_MAX_BYTES = int(os.getenv("QR_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "http://localhost:5173")
+
+# Load the EasyOCR reader and LLM client when the worker starts instead of on
+# the first menu upload.
+OCR_PRELOAD = os.getenv("OCR_PRELOAD", "0") == "1"
+
+# Menu uploads are processed by a local thread pool. OCR_MAX_WORKERS bounds how
+# many run at once, OCR_MAX_PENDING how many may wait before uploads get a 503.
+OCR_MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", "2"))
+OCR_MAX_PENDING = int(os.getenv("OCR_MAX_PENDING", "16"))
+OCR_JOB_TTL = 60 * 60
+
+# Photos are EXIF-rotated, converted to grayscale, downscaled to roughly an A4
+# page at OCR_TARGET_DPI and deskewed before OCR. OCR_TILE_COLUMNS splits
+# multi-column menus at their gutters. OCR_TILE_WORKERS defaults to 1, which
+# reads every column and every page of a multi-page upload one after another
+# on the shared reader. Set it above 1 to read them in parallel in that many
+# worker processes; each loads its own reader (several hundred MB), so size it
+# to the memory available rather than the CPU count.
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "1") == "1"
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "200"))
+OCR_TILE_COLUMNS = os.getenv("OCR_TILE_COLUMNS", "0") == "1"
+OCR_TILE_WORKERS = int(os.getenv("OCR_TILE_WORKERS", "1"))
+
+# An upload may be several photos or a PDF (rendered with pypdfium2), up to
+# OCR_MAX_PAGES pages. Their text goes to the LLM in one call while it fits in
+# OCR_LLM_MAX_CHARS, otherwise one call per page with the results merged.
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "20"))
+OCR_LLM_MAX_CHARS = int(os.getenv("OCR_LLM_MAX_CHARS", "12000"))
+
+# Pages are first parsed by rules over the OCR bounding boxes (names aligned
+# with prices, headers by size). Only pages scoring below
+# OCR_FAST_PATH_MIN_CONFIDENCE (0-1) are sent to the LLM.
+OCR_FAST_PATH = os.getenv("OCR_FAST_PATH", "1") == "1"
+OCR_FAST_PATH_MIN_CONFIDENCE = float(os.getenv("OCR_FAST_PATH_MIN_CONFIDENCE", "0.7"))
+
+# Menu text is parsed by the LLM_BACKEND backend: "gemini", or "local" for a
+# deterministic offline stand-in (with LLM_LOCAL_LATENCY_MS of fake response
+# time) for tests and load tests. Replies that fail or do not match the menu
+# schema are retried up to LLM_MAX_ATTEMPTS times, waiting LLM_RETRY_BACKOFF
+# seconds and doubling after each failure.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_LOCAL_LATENCY_MS = int(os.getenv("LLM_LOCAL_LATENCY_MS", "0"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "1.0"))
+
+# OCR text and LLM replies are cached on disk by a hash of their input, so a
+# re-uploaded photo skips both. Least recently used entries are evicted once
+# the cache outgrows OCR_CACHE_MAX_BYTES.
+OCR_CACHE_DIR = MEDIA_ROOT/'ocrcache'
+OCR_CACHE_MAX_BYTES = int(os.getenv("OCR_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Per-request timing and query counts, exported on /metrics (only to
+# METRICS_ALLOWED_IPS). Requests slower than PROFILING_SLOW_MS are logged
+# with their SQL.
+#
+# The IP check reads REMOTE_ADDR, so behind a reverse proxy on the same host
+# every request looks local. Set METRICS_TOKEN there: scrapers must then also
+# send "Authorization: Bearer <token>".
+PROFILING = os.getenv("PROFILING", "0") == "1"
+PROFILING_SLOW_MS = int(os.getenv("PROFILING_SLOW_MS", "500"))
+METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
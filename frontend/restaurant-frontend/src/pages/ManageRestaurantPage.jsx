@@ -75,33 +75,69 @@ export default function OrderManagementPage() {
     }
   }
 
+  function applyOrderEvent(event) {
+    const order = normalizeOrder(JSON.parse(event.data).order);
+
+    setOrdersData((prev) => {
+      const pending = prev.pending.filter((o) => o.id !== order.id);
+      const completed = prev.completed.filter((o) => o.id !== order.id);
+
+      if (order.status === "served") {
+        return { pending, completed: [order, ...completed] };
+      }
+      if (order.status === "pending" || order.status === "preparing") {
+        return { pending: [order, ...pending], completed };
+      }
+      return { pending, completed };
+    });
+  }
+
   // 🔹 initial fetch
   fetchOrders();
 
-  // 🔹 poll every 5 seconds
-  const interval = setInterval(fetchOrders, 5000);
+  // 🔹 poll every 5 seconds while the live stream is down (e.g. a WSGI
+  // server, which cannot stream); stops again once the stream connects
+  let interval = null;
+
+  function startPolling() {
+    if (!interval) interval = setInterval(fetchOrders, 5000);
+  }
+
+  function stopPolling() {
+    clearInterval(interval);
+    interval = null;
+  }
+
+  // 🔹 live updates pushed by the server; refetch whenever the stream
+  // (re)connects or reports that it dropped events
+  const token = localStorage.getItem("accessToken");
+  const source = new EventSource(link + `stream/?token=${token}`);
+  source.addEventListener("open", () => {
+    stopPolling();
+    fetchOrders();
+  });
+  source.addEventListener("error", startPolling);
+  source.addEventListener("resync", fetchOrders);
+  source.addEventListener("order.created", applyOrderEvent);
+  source.addEventListener("order.updated", applyOrderEvent);
 
   // 🔹 cleanup
   return () => {
     isMounted = false;
-    clearInterval(interval);
+    source.close();
+    stopPolling();
   };
 }, [link]);
 
 
   /* -------------------- NORMALIZE BACKEND DATA -------------------- */
   function normalizeOrder(order) {
-    const total = order.items.reduce(
-      (sum, i) => sum + i.price * i.quantity,
-      0
-    );
-
     return {
       id: order.order_id,
       table: order.table_number,
       status: order.status,
       items: order.items,
-      total,
+      total: Number(order.total),
     };
   }
 
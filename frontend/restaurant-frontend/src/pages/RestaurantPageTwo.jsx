@@ -53,9 +53,24 @@ const uploadMenu = async () => {
       body: formData,
     });
 
-    const data = await res.json();
-    console.log(data);
-    const normalizedMenu = normalizeAIMenu(data.result);
+    let job = await res.json();
+    if (!res.ok) throw new Error(job.error || "Menu upload failed");
+
+    // OCR runs as a background job on the server; poll until it finishes.
+    while (job.status === "queued" || job.status === "running") {
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+      const jobRes = await fetch(link + `${job.job_id}/`, {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      });
+      job = await jobRes.json();
+      if (!jobRes.ok) throw new Error(job.error || "Menu processing failed");
+    }
+
+    if (job.status !== "done") throw new Error(job.error || "Menu processing failed");
+    console.log(job);
+    const normalizedMenu = normalizeAIMenu(job.result);
 
     if (!normalizedMenu || normalizedMenu.length === 0) {
       throw new Error("Menu normalization failed");
@@ -8,7 +8,23 @@ export default function TablesQRPage() {
   const navigate = useNavigate();
 
   const getQrUrl = (table) =>
-    `${serverLink}media/qrcodes/restaurant_${restaurantId}_table_${table}.png`;
+    `${serverLink}qr/${restaurantId}/${table}.png`;
+
+  const downloadAll = async () => {
+    const res = await fetch(`${serverLink}qr/${restaurantId}/export.zip`, {
+      headers: {
+        Authorization: `Bearer ${localStorage.getItem("accessToken")}`,
+      },
+    });
+    if (!res.ok) return;
+
+    const url = URL.createObjectURL(await res.blob());
+    const a = document.createElement("a");
+    a.href = url;
+    a.download = `restaurant_${restaurantId}_qrcodes.zip`;
+    a.click();
+    URL.revokeObjectURL(url);
+  };
 
   return (
     <Box
@@ -89,10 +105,24 @@ export default function TablesQRPage() {
         <Typography variant="h4" sx={{ fontWeight: 700, mb: 1 }}>
           Table QR Codes
         </Typography>
-        <Typography sx={{ color: "#94a3b8", mb: 5 }}>
+        <Typography sx={{ color: "#94a3b8", mb: 2 }}>
           Print and place these QR codes on tables.
         </Typography>
 
+        <Button
+          variant="outlined"
+          onClick={downloadAll}
+          sx={{
+            mb: 5,
+            borderRadius: 3,
+            borderColor: "#334155",
+            color: "white",
+            ":hover": { borderColor: "white" },
+          }}
+        >
+          Download all (ZIP)
+        </Button>
+
         <Grid container spacing={3}>
           {Array.from({ length: tablesCount }, (_, i) => i + 1).map((table) => (
             <Grid item xs={12} sm={6} md={4} lg={3} key={table}>
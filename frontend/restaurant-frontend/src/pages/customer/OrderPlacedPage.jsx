@@ -1,4 +1,4 @@
-import { useEffect, useRef, useState } from "react";
+import { useEffect, useState } from "react";
 import { Moon, Sun } from "lucide-react";
 import { useParams } from "react-router-dom";
 import { serverLink } from "@/utils/links";
@@ -12,36 +12,46 @@ export default function OrderPlacedPage() {
   const [order, setOrder] = useState(null);
   const [loading, setLoading] = useState(true);
 
-  // store interval ref so we can stop polling
-  const intervalRef = useRef(null);
-
-  const fetchStatus = async () => {
-    try {
-      const res = await fetch(serverLink + `orders/${order_id}/`);
-      if (!res.ok) throw new Error("Failed to fetch order");
-      const data = await res.json();
-      setOrder(data);
-      setLoading(false);
-
-      // 🟢 stop polling once served
-      if (data.status === "served" && intervalRef.current) {
-        clearInterval(intervalRef.current);
-        intervalRef.current = null;
-      }
-    } catch (err) {
-      console.error(err);
-    }
-  };
-
   useEffect(() => {
-    fetchStatus();
+    let active = true;
+    let etag = null;
+
+    // Long-poll: the server holds the request until the status changes
+    // (or ~25s pass) and answers 304 when nothing changed.
+    const pollStatus = async () => {
+      while (active) {
+        try {
+          const headers = etag ? { "If-None-Match": etag } : {};
+          const res = await fetch(
+            serverLink + `orders/${order_id}/` + (etag ? "?wait=25" : ""),
+            { headers, cache: "no-store" }
+          );
+
+          if (res.status !== 304) {
+            if (!res.ok) throw new Error("Failed to fetch order");
+            const data = await res.json();
+            if (!active) return;
+            etag = res.headers.get("ETag");
+            setOrder(data);
+            setLoading(false);
+
+            // 🟢 stop polling once served
+            if (data.status === "served") return;
+
+            // no ETag (e.g. blocked by a proxy): fall back to plain polling
+            if (!etag) await new Promise((resolve) => setTimeout(resolve, 5000));
+          }
+        } catch (err) {
+          console.error(err);
+          await new Promise((resolve) => setTimeout(resolve, 5000));
+        }
+      }
+    };
 
-    intervalRef.current = setInterval(fetchStatus, 5000);
+    pollStatus();
 
     return () => {
-      if (intervalRef.current) {
-        clearInterval(intervalRef.current);
-      }
+      active = false;
     };
   }, [order_id]);
 